@@ -1,95 +1,415 @@
 import numpy as np
 import cv2
 from waste_categories import ADVANCED_WASTE_CATEGORIES, get_eco_tips
+from feature_context import FeatureContext
+from scoring_rules import load_scoring_rules
+from texture_features import DEFAULT_GLCM_OFFSETS, compute_glcm, glcm_statistics, lbp_histogram
+
+IMAGE_SIZE = 224
+
+# Stages reported per prediction. The color stage only needs channel
+# statistics; texture (edges, Laplacian, histogram, GLCM, LBP) and shape
+# (contours) are the expensive ones a cascade may skip.
+FAST_STAGES = ('color',)
+FULL_STAGES = ('color', 'texture', 'shape')
+# Region windows get color statistics plus edge density and sharpness, the
+# texture features that can be read off integral images
+REGION_STAGES = ('color', 'texture')
+
+# Limits on the region grid a client may request. Merging overlapping
+# windows is quadratic in their count, so the grid must stay small.
+MIN_REGION_WINDOW = 1 / 8
+MAX_REGION_WINDOWS = 1024
+
+# (plane name, feature names per channel) summed into integral images for
+# region mode
+REGION_PLANES = (
+    ('hsv', ('hue', 'saturation', 'value')),
+    ('lab', ('l', 'a', 'b')),
+    ('image', ('blue', 'green', 'red')),
+    ('gray', ('brightness',)),
+)
+
+def check_region_grid(window, stride):
+    """
+    Number of windows predict_regions() evaluates for this grid. Raises
+    ValueError unless MIN_REGION_WINDOW <= window <= 1 and
+    window / 4 <= stride <= window, or when the grid would exceed
+    MAX_REGION_WINDOWS windows.
+    """
+    if not MIN_REGION_WINDOW <= window <= 1:
+        raise ValueError(f"window must be between {MIN_REGION_WINDOW:g} and 1")
+    if not window / 4 <= stride <= window:
+        raise ValueError("stride must be between window / 4 and window")
+    
+    side = int(round(IMAGE_SIZE / window))
+    step = max(1, int(round(stride * side)))
+    count = (-(-(side - IMAGE_SIZE) // step) + 1) ** 2
+    if count > MAX_REGION_WINDOWS:
+        raise ValueError(f"Grid of {count} windows exceeds the limit of {MAX_REGION_WINDOWS}")
+    return count
 
 class AdvancedWasteClassifier:
-    def __init__(self):
+    def __init__(self, rules_path=None, cascade=False, cascade_margin=20):
         self.categories = ADVANCED_WASTE_CATEGORIES
+        self.scoring_rules = load_scoring_rules(rules_path)
+        # In cascade mode texture and shape stages only run when the color
+        # scores leave fewer than cascade_margin points between the top two
+        self.cascade = cascade
+        self.cascade_margin = cascade_margin
         print("Advanced Waste Classifier initialized with enhanced detection")
         
-    def predict(self, image):
+    def predict(self, image, cascade=None):
+        return self.predict_batch([image], cascade)[0]
+    
+    def predict_batch(self, images, cascade=None):
+        """Classify several images at once, same results as calling predict on each"""
+        results = [None] * len(images)
+        resized, indices = self._resize_images(images, results)
+        
+        if not resized:
+            return results
+        
         try:
-            image_resized = cv2.resize(image, (224, 224))
+            scores, needs_full = self._score_batch(np.stack(resized), cascade)
             
-            features = self._extract_features(image_resized)
+            waste_types, confidences = self._predictions_from_scores(scores)
             
-            waste_type, confidence = self._classify_by_features(features, image_resized)
+            for i, waste_type, confidence, full in zip(indices, waste_types, confidences, needs_full):
+                stages_run = FULL_STAGES if full else FAST_STAGES
+                results[i] = self._build_result(waste_type, float(confidence), stages_run)
+                
+        except Exception as e:
+            for i in indices:
+                results[i] = self._error_result(e)
+        
+        return results
+    
+    def score_image(self, image, cascade=None):
+        """Raw per-category rule scores of one image, for callers that combine several frames"""
+        results = [None]
+        resized, _ = self._resize_images([image], results)
+        
+        if not resized:
+            return results[0]
+        
+        try:
+            scores, needs_full = self._score_batch(resized[0][None], cascade)
+        except Exception as e:
+            return self._error_result(e)
+        
+        return {
+            'scores': scores[0],
+            'stages_run': list(FULL_STAGES if needs_full[0] else FAST_STAGES)
+        }
+    
+    def result_from_scores(self, scores, stages_run=FULL_STAGES):
+        """Build a predict() style result from a row of category scores"""
+        waste_types, confidences = self._predictions_from_scores(np.atleast_2d(scores))
+        return self._build_result(waste_types[0], float(confidences[0]), stages_run)
+    
+    def _resize_images(self, images, results):
+        resized = []
+        indices = []
+        
+        for i, image in enumerate(images):
+            try:
+                image_resized = cv2.resize(image, (IMAGE_SIZE, IMAGE_SIZE))
+                if image_resized.shape != (IMAGE_SIZE, IMAGE_SIZE, 3):
+                    raise ValueError("Expected a 3-channel BGR image")
+                resized.append(image_resized)
+                indices.append(i)
+            except Exception as e:
+                results[i] = self._error_result(e)
+        
+        return resized, indices
+    
+    def _score_batch(self, batch, cascade=None):
+        if cascade is None:
+            cascade = self.cascade
+        
+        features, contexts = self._extract_color_features(batch)
+        
+        if cascade:
+            scores = self.scoring_rules.score(features, allow_missing=True)
+            ordered = np.sort(scores, axis=1)
+            needs_full = ordered[:, -1] - ordered[:, -2] < self.cascade_margin
+        else:
+            scores = np.zeros((len(batch), len(self.scoring_rules.categories)))
+            needs_full = np.ones(len(batch), dtype=bool)
+        
+        pending = np.flatnonzero(needs_full)
+        if len(pending):
+            self._extract_texture_features(features, contexts, pending)
+            scores[pending] = self.scoring_rules.score(
+                {name: values[pending] for name, values in features.items()}
+            )
+        
+        return scores, needs_full
+    
+    def predict_regions(self, image, window=1/3, stride=1/6, min_confidence=0.5):
+        """
+        Classify overlapping windows of a photo of several items.
+        
+        `window` and `stride` are fractions of the image side; stride equal to
+        window gives a plain grid. The image is scaled so every window is
+        IMAGE_SIZE pixels square, and per-window statistics come from integral
+        images, so each window costs O(1) regardless of its size. Overlapping
+        windows of the same category are merged into one region.
+        """
+        try:
+            check_region_grid(window, stride)
+            
+            height, width = image.shape[:2]
+            side = int(round(IMAGE_SIZE / window))
+            working = cv2.resize(image, (side, side))
+            if working.shape != (side, side, 3):
+                raise ValueError("Expected a 3-channel BGR image")
+            
+            boxes = self._window_boxes(side, IMAGE_SIZE, max(1, int(round(stride * side))))
+            features = self._window_features(FeatureContext(working), boxes)
             
-            category_info = self.categories.get(waste_type, self.categories['landfill_general'])
-            eco_tips = get_eco_tips(waste_type, confidence)
+            scores = self.scoring_rules.score(features, allow_missing=True)
+            waste_types, confidences = self._predictions_from_scores(scores)
+            
+            keep = confidences >= min_confidence
+            regions = self._merge_regions(
+                boxes[keep],
+                [t for t, k in zip(waste_types, keep) if k],
+                confidences[keep]
+            )
+            
+            scale_x = width / side
+            scale_y = height / side
+            results = []
+            for waste_type, confidence, (x0, y0, x1, y1), count in regions:
+                category_info = self.categories.get(waste_type, self.categories['landfill_general'])
+                results.append({
+                    'waste_type': waste_type,
+                    'category_name': category_info['name'],
+                    'confidence': round(float(confidence), 2),
+                    'bbox': [
+                        int(round(x0 * scale_x)),
+                        int(round(y0 * scale_y)),
+                        int(round((x1 - x0) * scale_x)),
+                        int(round((y1 - y0) * scale_y))
+                    ],
+                    'windows': count,
+                    'disposal_instructions': category_info['disposal_instructions'],
+                    'recycling_code': category_info['recycling_code']
+                })
             
             return {
-                'waste_type': waste_type,
-                'category_name': category_info['name'],
-                'confidence': round(confidence, 2),
-                'subcategories': category_info['subcategories'],
-                'disposal_instructions': category_info['disposal_instructions'],
-                'recycling_code': category_info['recycling_code'],
-                'eco_tips': eco_tips,
-                'contamination_warnings': category_info['contamination_warnings']
+                'regions': results,
+                'windows_evaluated': len(boxes),
+                'stages_run': list(REGION_STAGES)
             }
             
         except Exception as e:
-            return {
-                'error': str(e),
-                'waste_type': 'unknown',
-                'confidence': 0.0
-            }
+            return self._error_result(e)
     
-    def _extract_features(self, image):
+    def _window_boxes(self, side, size, step):
+        starts = list(range(0, side - size + 1, step))
+        if starts[-1] != side - size:
+            starts.append(side - size)
+        
+        y0, x0 = np.meshgrid(starts, starts, indexing='ij')
+        y0 = y0.ravel()
+        x0 = x0.ravel()
+        return np.stack([x0, y0, x0 + size, y0 + size], axis=1)
+    
+    def _window_features(self, ctx, boxes):
+        """Mean/std features of every window box, read off integral images"""
+        x0, y0, x1, y1 = boxes.T
+        area = ((x1 - x0) * (y1 - y0)).astype(np.float64)[:, None]
+        
+        def window_stats(plane):
+            sums, squares = cv2.integral2(plane, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+            if sums.ndim == 2:
+                sums = sums[:, :, None]
+                squares = squares[:, :, None]
+            
+            def box_sum(table):
+                return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+            
+            mean = box_sum(sums) / area
+            variance = np.maximum(box_sum(squares) / area - mean ** 2, 0)
+            return mean, variance
+        
         features = {}
+        for plane_name, channels in REGION_PLANES:
+            mean, variance = window_stats(getattr(ctx, plane_name))
+            std = np.sqrt(variance)
+            for i, channel in enumerate(channels):
+                features[f'avg_{channel}'] = mean[:, i]
+                features[f'std_{channel}'] = std[:, i]
+        
+        edge_mean, _ = window_stats((ctx.edges > 0).astype(np.uint8))
+        features['edge_density'] = edge_mean[:, 0]
+        
+        _, laplacian_variance = window_stats(ctx.laplacian)
+        features['texture_sharpness'] = laplacian_variance[:, 0]
+        
+        self._add_derived_color_features(features)
+        
+        return features
+    
+    def _merge_regions(self, boxes, waste_types, confidences):
+        """Union overlapping same-category windows into (type, confidence, box, count)"""
+        parent = list(range(len(boxes)))
+        
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                if waste_types[i] != waste_types[j]:
+                    continue
+                overlaps = (
+                    boxes[i][0] < boxes[j][2] and boxes[j][0] < boxes[i][2]
+                    and boxes[i][1] < boxes[j][3] and boxes[j][1] < boxes[i][3]
+                )
+                if overlaps:
+                    parent[find(i)] = find(j)
+        
+        groups = {}
+        for i in range(len(boxes)):
+            groups.setdefault(find(i), []).append(i)
+        
+        regions = []
+        for members in groups.values():
+            member_boxes = boxes[members]
+            merged_box = (
+                member_boxes[:, 0].min(),
+                member_boxes[:, 1].min(),
+                member_boxes[:, 2].max(),
+                member_boxes[:, 3].max()
+            )
+            confidence = max(confidences[i] for i in members)
+            regions.append((waste_types[members[0]], confidence, merged_box, len(members)))
+        
+        regions.sort(key=lambda region: region[1], reverse=True)
+        return regions
+    
+    def _build_result(self, waste_type, confidence, stages_run=FULL_STAGES):
+        category_info = self.categories.get(waste_type, self.categories['landfill_general'])
+        eco_tips = get_eco_tips(waste_type, confidence)
+        
+        return {
+            'waste_type': waste_type,
+            'category_name': category_info['name'],
+            'confidence': round(confidence, 2),
+            'subcategories': category_info['subcategories'],
+            'disposal_instructions': category_info['disposal_instructions'],
+            'recycling_code': category_info['recycling_code'],
+            'eco_tips': eco_tips,
+            'contamination_warnings': category_info['contamination_warnings'],
+            'stages_run': list(stages_run)
+        }
+    
+    def _error_result(self, error):
+        return {
+            'error': str(error),
+            'waste_type': 'unknown',
+            'confidence': 0.0
+        }
+    
+    def _convert_batch(self, batch, code):
+        # Color conversions are per pixel, so the whole batch is converted as
+        # one tall image instead of image by image.
+        n, h, w = batch.shape[:3]
+        converted = cv2.cvtColor(batch.reshape(n * h, w, 3), code)
+        return converted.reshape((n, h, w) + converted.shape[2:])
+    
+    def _channel_stats(self, planes):
+        # Channel-first contiguous planes keep every per-image reduction
+        # identical to reducing that image on its own.
+        if planes.ndim == 4:
+            planes = np.ascontiguousarray(np.moveaxis(planes, -1, 1))
+            axes = (2, 3)
+        else:
+            axes = (1, 2)
+        return np.mean(planes, axis=axes), np.std(planes, axis=axes)
+    
+    def _extract_features(self, batch):
+        features, contexts = self._extract_color_features(batch)
+        self._extract_texture_features(features, contexts, np.arange(len(batch)))
+        return features, contexts
+    
+    def _extract_color_features(self, batch):
+        features = {}
+        
+        hsv = self._convert_batch(batch, cv2.COLOR_BGR2HSV)
+        lab = self._convert_batch(batch, cv2.COLOR_BGR2LAB)
+        gray = self._convert_batch(batch, cv2.COLOR_BGR2GRAY)
+        
+        contexts = [
+            FeatureContext(batch[i], gray=gray[i], hsv=hsv[i], lab=lab[i])
+            for i in range(len(batch))
+        ]
+        
+        avg, std = self._channel_stats(hsv)
+        features['avg_hue'], features['avg_saturation'], features['avg_value'] = avg.T
+        features['std_hue'], features['std_saturation'], features['std_value'] = std.T
+        
+        avg, std = self._channel_stats(lab)
+        features['avg_l'], features['avg_a'], features['avg_b'] = avg.T
+        features['std_l'], features['std_a'], features['std_b'] = std.T
+        
+        avg, std = self._channel_stats(batch)
+        features['avg_blue'], features['avg_green'], features['avg_red'] = avg.T
+        features['std_blue'], features['std_green'], features['std_red'] = std.T
+        
+        features['avg_brightness'], features['std_brightness'] = self._channel_stats(gray)
+        
+        self._add_derived_color_features(features)
+        
+        return features, contexts
     
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        features['avg_hue'] = np.mean(hsv[:, :, 0])
-        features['avg_saturation'] = np.mean(hsv[:, :, 1])
-        features['avg_value'] = np.mean(hsv[:, :, 2])
-        features['std_hue'] = np.std(hsv[:, :, 0])
-        features['std_saturation'] = np.std(hsv[:, :, 1])
-        features['std_value'] = np.std(hsv[:, :, 2])
-        
-        features['avg_l'] = np.mean(lab[:, :, 0])
-        features['avg_a'] = np.mean(lab[:, :, 1])
-        features['avg_b'] = np.mean(lab[:, :, 2])
-        features['std_l'] = np.std(lab[:, :, 0])
-        features['std_a'] = np.std(lab[:, :, 1])
-        features['std_b'] = np.std(lab[:, :, 2])
-        
-        features['avg_blue'] = np.mean(image[:, :, 0])
-        features['avg_green'] = np.mean(image[:, :, 1])
-        features['avg_red'] = np.mean(image[:, :, 2])
-        features['std_blue'] = np.std(image[:, :, 0])
-        features['std_green'] = np.std(image[:, :, 1])
-        features['std_red'] = np.std(image[:, :, 2])
-        
-        features['avg_brightness'] = np.mean(gray)
-        features['std_brightness'] = np.std(gray)
-        
-        edges = cv2.Canny(gray, 50, 150)
-        features['edge_density'] = np.sum(edges > 0) / edges.size
-        
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-        features['texture_sharpness'] = laplacian_var
-        
-        hist = cv2.calcHist([gray], [0], None, [64], [0, 256])
-        hist = cv2.normalize(hist, hist).flatten()
-        features['entropy'] = -np.sum(hist * np.log2(hist + 1e-10))
+    def _add_derived_color_features(self, features):
+        features['a_offset'] = np.abs(features['avg_a'] - 128)
+        features['b_offset'] = np.abs(features['avg_b'] - 128)
         
         features['blue_ratio'] = features['avg_blue'] / (features['avg_red'] + features['avg_green'] + 1e-10)
         features['green_ratio'] = features['avg_green'] / (features['avg_red'] + features['avg_blue'] + 1e-10)
         features['red_ratio'] = features['avg_red'] / (features['avg_green'] + features['avg_blue'] + 1e-10)
         
         features['color_uniformity'] = 1.0 - (features['std_red'] + features['std_green'] + features['std_blue']) / 255.0
-        
-        return features
     
-    def _detect_shapes(self, image):
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
+    def _extract_texture_features(self, features, contexts, indices):
+        """Add texture and shape features for the images at `indices`, NaN elsewhere"""
+        selected = [contexts[i] for i in indices]
+        
+        def store(name, values):
+            if name not in features:
+                features[name] = np.full(len(contexts), np.nan)
+            features[name][indices] = values
+        
+        edges = np.stack([ctx.edges for ctx in selected])
+        store('edge_density', np.count_nonzero(edges, axis=(1, 2)) / edges[0].size)
+        
+        store('texture_sharpness', [ctx.laplacian.var() for ctx in selected])
         
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        store('entropy', [
+            -np.sum(ctx.histogram * np.log2(ctx.histogram + 1e-10)) for ctx in selected
+        ])
+        
+        shapes = np.array([self._detect_shapes(ctx) for ctx in selected], dtype=np.float64)
+        store('circularity', shapes[:, 0])
+        store('shape_complexity', shapes[:, 1])
+        store('solidity', shapes[:, 2])
+        
+        textures = [self._detect_texture_patterns(ctx) for ctx in selected]
+        store('glcm_contrast', [glcm['contrast'] for glcm, _ in textures])
+        store('glcm_homogeneity', [glcm['homogeneity'] for glcm, _ in textures])
+        store('lbp_std', [lbp['std'] for _, lbp in textures])
+    
+    def _detect_shapes(self, ctx):
+        image = ctx.image
+        contours = ctx.contours
         
         if not contours:
             return 0, 0, 0
@@ -109,8 +429,8 @@ class AdvancedWasteClassifier:
         
         return avg_circularity, shape_complexity, solidity_ratio
     
-    def _detect_texture_patterns(self, image):
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    def _detect_texture_patterns(self, ctx):
+        gray = ctx.gray
         
         glcm_features = self._calculate_glcm(gray)
         
@@ -118,219 +438,34 @@ class AdvancedWasteClassifier:
         
         return glcm_features, lbp
     
-    def _calculate_glcm(self, gray):
-        glcm = np.zeros((8, 8))
-        h, w = gray.shape
-        
-        for i in range(h-1):
-            for j in range(w-1):
-                glcm[gray[i,j]//32, gray[i,j+1]//32] += 1
-                glcm[gray[i,j]//32, gray[i+1,j]//32] += 1
-        
-        if np.sum(glcm) > 0:
-            glcm = glcm / np.sum(glcm)
-        
-        contrast = 0
-        homogeneity = 0
-        for i in range(8):
-            for j in range(8):
-                contrast += glcm[i,j] * (i - j) ** 2
-                homogeneity += glcm[i,j] / (1 + (i - j) ** 2)
-        
-        return contrast, homogeneity
+    def _calculate_glcm(self, gray, levels=8, offsets=DEFAULT_GLCM_OFFSETS):
+        glcm = compute_glcm(gray, levels, offsets)
+        return glcm_statistics(glcm)
+    
+    def _calculate_lbp(self, gray, mode='default'):
+        return lbp_histogram(gray, mode)
     
-    def _calculate_lbp(self, gray):
-        h, w = gray.shape
-        lbp = np.zeros_like(gray)
-        
-        for i in range(1, h-1):
-            for j in range(1, w-1):
-                center = gray[i,j]
-                code = 0
-                code |= (gray[i-1,j-1] > center) << 7
-                code |= (gray[i-1,j] > center) << 6
-                code |= (gray[i-1,j+1] > center) << 5
-                code |= (gray[i,j+1] > center) << 4
-                code |= (gray[i+1,j+1] > center) << 3
-                code |= (gray[i+1,j] > center) << 2
-                code |= (gray[i+1,j-1] > center) << 1
-                code |= (gray[i,j-1] > center) << 0
-                lbp[i,j] = code
-        
-        hist, _ = np.histogram(lbp, bins=256, range=(0, 255))
-        hist = hist.astype("float")
-        hist /= (hist.sum() + 1e-10)
-        
-        return np.std(hist)
+    def _classify_by_features(self, f, contexts):
+        return self._predictions_from_scores(self.scoring_rules.score(f))
     
-    def _classify_by_features(self, f, image):
-        circularity, complexity, solidity = self._detect_shapes(image)
-        glcm_contrast, glcm_homogeneity = self._calculate_glcm(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
-        lbp_std = self._calculate_lbp(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
-        
-        scores = {}
-        
-        paper_score = 0
-        if 10 <= f['avg_hue'] <= 30 or 150 <= f['avg_hue'] <= 180:
-            paper_score += 25
-        if 80 <= f['avg_brightness'] <= 200:
-            paper_score += 20
-        if f['avg_saturation'] < 80:
-            paper_score += 15
-        if f['edge_density'] > 0.08:
-            paper_score += 15
-        if abs(f['avg_a'] - 128) < 15:
-            paper_score += 10
-        if f['texture_sharpness'] < 100:
-            paper_score += 10
-        if f['color_uniformity'] > 0.7:
-            paper_score += 5
-        scores['recyclable_paper'] = paper_score
-        
-        plastic_score = 0
-        if f['avg_saturation'] > 60:
-            plastic_score += 20
-        if f['std_brightness'] < 40:
-            plastic_score += 20
-        if f['edge_density'] < 0.12:
-            plastic_score += 15
-        if f['avg_brightness'] > 120:
-            plastic_score += 15
-        if f['blue_ratio'] > 0.4 or f['red_ratio'] > 0.4:
-            plastic_score += 15
-        if circularity > 0.6:
-            plastic_score += 10
-        if f['color_uniformity'] > 0.8:
-            plastic_score += 5
-        scores['recyclable_plastic'] = plastic_score
-        
-        glass_score = 0
-        if f['avg_brightness'] > 160:
-            glass_score += 25
-        if f['std_brightness'] > 50:
-            glass_score += 25
-        if f['avg_saturation'] < 40:
-            glass_score += 20
-        if f['edge_density'] < 0.08:
-            glass_score += 15
-        if f['texture_sharpness'] > 200:
-            glass_score += 10
-        if glcm_contrast < 0.1:
-            glass_score += 5
-        scores['recyclable_glass'] = glass_score
-        
-        metal_score = 0
-        if abs(f['avg_a'] - 128) < 20 and abs(f['avg_b'] - 128) < 20:
-            metal_score += 25
-        if f['avg_brightness'] > 130:
-            metal_score += 20
-        if f['std_brightness'] > 40:
-            metal_score += 20
-        if f['avg_saturation'] < 60:
-            metal_score += 15
-        if f['texture_sharpness'] > 150:
-            metal_score += 10
-        if lbp_std < 0.02:
-            metal_score += 10
-        scores['recyclable_metal'] = metal_score
-        
-        food_score = 0
-        if (5 <= f['avg_hue'] <= 50) or (150 <= f['avg_hue'] <= 180):
-            food_score += 20
-        if 50 < f['avg_saturation'] < 180:
-            food_score += 20
-        if 60 < f['avg_brightness'] < 190:
-            food_score += 15
-        if f['edge_density'] > 0.15:
-            food_score += 15
-        if f['std_hue'] > 20:
-            food_score += 15
-        if complexity > 0.3:
-            food_score += 10
-        if f['entropy'] > 4.0:
-            food_score += 5
-        scores['organic_food'] = food_score
-        
-        yard_score = 0
-        if 35 <= f['avg_hue'] <= 90:
-            yard_score += 30
-        if f['green_ratio'] > 0.4:
-            yard_score += 25
-        if 50 < f['avg_saturation'] < 200:
-            yard_score += 20
-        if f['edge_density'] > 0.18:
-            yard_score += 15
-        if f['std_green'] > 20:
-            yard_score += 10
-        scores['organic_yard'] = yard_score
-        
-        hazardous_score = 0
-        if (0 <= f['avg_hue'] <= 15) or (160 <= f['avg_hue'] <= 180):
-            hazardous_score += 25
-        if f['avg_saturation'] > 120:
-            hazardous_score += 20
-        if f['red_ratio'] > 0.4:
-            hazardous_score += 20
-        if f['edge_density'] > 0.2:
-            hazardous_score += 15
-        if f['std_red'] > 25:
-            hazardous_score += 10
-        if f['color_uniformity'] < 0.6:
-            hazardous_score += 10
-        scores['hazardous'] = hazardous_score
-        
-        ewaste_score = 0
-        if f['avg_brightness'] < 120:
-            ewaste_score += 25
-        if f['avg_saturation'] < 70:
-            ewaste_score += 20
-        if f['edge_density'] > 0.25:
-            ewaste_score += 20
-        if abs(f['avg_a'] - 128) < 25:
-            ewaste_score += 15
-        if f['std_brightness'] > 35:
-            ewaste_score += 15
-        if complexity > 0.5:
-            ewaste_score += 10
-        if lbp_std > 0.03:
-            ewaste_score += 5
-        scores['e_waste'] = ewaste_score
-        
-        landfill_score = 0
-        landfill_threshold = 65
-        
-        if all(score < landfill_threshold for score in scores.values()):
-            landfill_score += 50
-        
-        if 40 < f['avg_saturation'] < 130 and 70 < f['avg_brightness'] < 170:
-            landfill_score += 20
-        
-        if f['entropy'] < 3.0 and f['color_uniformity'] > 0.6:
-            landfill_score += 15
-        
-        if f['texture_sharpness'] < 50:
-            landfill_score += 15
-        
-        scores['landfill_general'] = landfill_score
-        
-        if not scores:
-            return 'landfill_general', 0.4
-        
-        best_type = max(scores, key=scores.get)
-        best_score = scores[best_type]
+    def _predictions_from_scores(self, scores):
+        best_idx = np.argmax(scores, axis=1)
+        best_score = scores[np.arange(len(scores)), best_idx]
+        runner_up = np.sort(scores, axis=1)[:, -2]
         
         max_possible_score = 100.0
-        confidence = min(best_score / max_possible_score, 0.92)
+        confidence = np.minimum(best_score / max_possible_score, 0.92)
         
-        confidence = max(confidence, 0.4)
+        confidence = np.maximum(confidence, 0.4)
         
-        score_difference = best_score - max([scores[k] for k in scores if k != best_type])
-        confidence_boost = min(score_difference / 50.0, 0.15)
-        confidence += confidence_boost
+        score_difference = best_score - runner_up
+        confidence_boost = np.minimum(score_difference / 50.0, 0.15)
+        confidence = confidence + confidence_boost
         
-        confidence = max(0.4, min(0.92, confidence))
+        confidence = np.maximum(0.4, np.minimum(0.92, confidence))
         
-        return best_type, confidence
+        waste_types = [self.scoring_rules.categories[i] for i in best_idx]
+        return waste_types, confidence
     
     def get_category_name(self, class_idx):
         category_mapping = {
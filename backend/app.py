@@ -2,14 +2,23 @@ from flask import Flask, request, jsonify
 import cv2
 import numpy as np
 import base64
+import os
 import traceback
 from flask_cors import CORS
-from advanced_classifier import AdvancedWasteClassifier
+from advanced_classifier import AdvancedWasteClassifier, check_region_grid
+from classifier_pool import ClassifierProcessPool
+from inference_batcher import MicroBatchingClassifier
+from hybrid_classifier import HybridWasteClassifier
 from waste_classifier import WasteClassifier
-from product_analyzer import ProductAnalyzer
+from product_analyzer import OCR_MODES, ProductAnalyzer
 from auth_manager import get_auth_manager, token_required
 from community_manager import CommunityManager
 from impact_calculator import ImpactCalculator
+from result_cache import PerceptualHashCache
+from stream_session import StreamSessionManager
+from product_cache import ProductCache
+from product_catalog import ProductCatalog
+from model_registry import model_registry
 from PIL import Image
 import io
 
@@ -22,26 +31,156 @@ CORS(app,
      supports_credentials=True)
 
 # Initialize components
-advanced_classifier = AdvancedWasteClassifier()
-simple_classifier = WasteClassifier()
-product_analyzer = ProductAnalyzer()
+advanced_classifier_options = {
+    'rules_path': os.environ.get('ECOLIFE_SCORING_RULES'),
+    'cascade': os.environ.get('ECOLIFE_CLASSIFIER_CASCADE', '').lower() in ('1', 'true', 'yes'),
+    'cascade_margin': float(os.environ.get('ECOLIFE_CASCADE_MARGIN', 20))
+}
+classifier_workers = int(os.environ.get('ECOLIFE_CLASSIFIER_WORKERS', 0))
+if classifier_workers > 0:
+    # Run the rule-based classifier in worker processes instead of on the request thread
+    advanced_classifier = ClassifierProcessPool(
+        pool_size=classifier_workers,
+        max_queue=int(os.environ.get('ECOLIFE_CLASSIFIER_QUEUE_DEPTH', 16)),
+        timeout=float(os.environ.get('ECOLIFE_CLASSIFIER_TIMEOUT', 10)),
+        **advanced_classifier_options
+    )
+else:
+    advanced_classifier = AdvancedWasteClassifier(**advanced_classifier_options)
+tflite_threads = os.environ.get('ECOLIFE_TFLITE_THREADS')
+cnn_classifier = WasteClassifier(
+    model_path=os.environ.get('ECOLIFE_MODEL_PATH'),
+    backend=os.environ.get('ECOLIFE_CNN_BACKEND', 'keras'),
+    num_threads=int(tflite_threads) if tflite_threads else None
+)
+
+def load_waste_cnn():
+    cnn_classifier.warm_up()
+    return cnn_classifier
+
+model_registry.register('waste_cnn', load_waste_cnn)
+
+# ECOLIFE_PRELOAD_MODELS=all (or a comma-separated list of names) loads models
+# before serving; prefork servers started with --preload then fork workers
+# that share them copy-on-write
+preload_models = os.environ.get('ECOLIFE_PRELOAD_MODELS', '')
+if preload_models:
+    model_registry.preload(None if preload_models == 'all' else preload_models.split(','))
+if not model_registry.is_loaded('waste_cnn'):
+    # Build or load the CNN and trace its graph now, not on the first request
+    model_registry.preload_async(['waste_cnn'])
+cnn_batch_size = int(os.environ.get('ECOLIFE_CNN_BATCH_SIZE', 16))
+if cnn_batch_size > 1:
+    # Concurrent requests share one forward pass instead of one each
+    simple_classifier = MicroBatchingClassifier(
+        cnn_classifier,
+        max_batch_size=cnn_batch_size,
+        max_wait_ms=float(os.environ.get('ECOLIFE_CNN_BATCH_WAIT_MS', 5)),
+        timeout=float(os.environ.get('ECOLIFE_CLASSIFIER_TIMEOUT', 10))
+    )
+else:
+    simple_classifier = cnn_classifier
+hybrid_classifier = HybridWasteClassifier(
+    advanced_classifier,
+    simple_classifier,
+    confidence_threshold=float(os.environ.get('ECOLIFE_HYBRID_THRESHOLD', 0.6)),
+    cnn_weight=float(os.environ.get('ECOLIFE_HYBRID_CNN_WEIGHT', 30))
+)
+product_cache = ProductCache(
+    db_path=os.environ.get('ECOLIFE_PRODUCT_CACHE_DB', 'ecolife_products.db'),
+    ttl=float(os.environ.get('ECOLIFE_PRODUCT_CACHE_TTL', 7 * 24 * 3600)),
+    negative_ttl=float(os.environ.get('ECOLIFE_PRODUCT_CACHE_NEGATIVE_TTL', 6 * 3600)),
+    memory_size=int(os.environ.get('ECOLIFE_PRODUCT_CACHE_MEMORY_SIZE', 1024))
+)
+# Offline Open Food Facts catalog, filled by product_catalog.py
+product_catalog = ProductCatalog(os.environ.get('ECOLIFE_PRODUCT_CATALOG_DB', 'ecolife_catalog.db'))
+product_analyzer = ProductAnalyzer(
+    product_cache=product_cache,
+    product_catalog=product_catalog,
+    lookup_timeout=float(os.environ.get('ECOLIFE_PRODUCT_LOOKUP_TIMEOUT', 10))
+)
 # FIXED: Use get_auth_manager() instead of AuthManager()
 auth_manager = get_auth_manager()
 community_manager = CommunityManager()
 impact_calculator = ImpactCalculator()
 
-def decode_image(image_data):
-    """Decode base64 image"""
+def create_result_cache():
+    """Perceptual-hash cache for classification results, sized from the environment"""
+    return PerceptualHashCache(
+        capacity=int(os.environ.get('ECOLIFE_RESULT_CACHE_SIZE', 256)),
+        ttl=float(os.environ.get('ECOLIFE_RESULT_CACHE_TTL', 600)),
+        max_distance=int(os.environ.get('ECOLIFE_RESULT_CACHE_DISTANCE', 4)),
+        color_tolerance=int(os.environ.get('ECOLIFE_RESULT_CACHE_COLOR_TOLERANCE', 8))
+    )
+
+def resolve_cascade(requested):
+    """Cascade mode a request runs with: its own choice, else the server default"""
+    if requested is None:
+        return advanced_classifier_options['cascade']
+    if isinstance(requested, str):
+        return requested.lower() in ('1', 'true', 'yes')
+    return bool(requested)
+
+advanced_result_cache = create_result_cache()
+hybrid_result_cache = create_result_cache()
+simple_result_cache = create_result_cache()
+
+stream_sessions = StreamSessionManager(
+    advanced_classifier,
+    max_sessions=int(os.environ.get('ECOLIFE_STREAM_MAX_SESSIONS', 100)),
+    idle_timeout=float(os.environ.get('ECOLIFE_STREAM_IDLE_TIMEOUT', 60)),
+    max_fps=float(os.environ.get('ECOLIFE_STREAM_MAX_FPS', 5)),
+    window=int(os.environ.get('ECOLIFE_STREAM_WINDOW', 5))
+)
+
+# Input size of both waste classifiers; uploads never need more than this
+CLASSIFIER_INPUT_SIZE = 224
+
+# JPEG DCT scaling factors OpenCV can decode at directly, largest first
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+def get_reduced_decode_flag(img_bytes, target_size):
+    """Pick the largest decode reduction that keeps both sides >= target_size"""
+    try:
+        # Image.open only parses the header, the pixels are not decoded here
+        with Image.open(io.BytesIO(img_bytes)) as probe:
+            width, height = probe.size
+    except Exception:
+        return cv2.IMREAD_COLOR
+    
+    for scale, flag in REDUCED_DECODE_FLAGS:
+        if min(width, height) / scale >= target_size:
+            return flag
+    
+    return cv2.IMREAD_COLOR
+
+def decode_image(image_data, target_size=None):
+    """
+    Decode base64 image.
+    
+    With target_size set, JPEGs are decoded at a reduced scale that still
+    covers target_size; leave it unset for full resolution (barcodes, OCR).
+    """
     try:
         if ',' in image_data:
             image_data = image_data.split(',')[1]
         
         img_bytes = base64.b64decode(image_data)
         img_array = np.frombuffer(img_bytes, dtype=np.uint8)
-        img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+        
+        read_flag = cv2.IMREAD_COLOR
+        if target_size:
+            read_flag = get_reduced_decode_flag(img_bytes, target_size)
+        img = cv2.imdecode(img_array, read_flag)
         
         if img is None:
             pil_image = Image.open(io.BytesIO(img_bytes))
+            if target_size:
+                pil_image.draft('RGB', (target_size, target_size))
             if pil_image.mode != 'RGB':
                 pil_image = pil_image.convert('RGB')
             
@@ -135,14 +274,22 @@ def classify_waste_advanced():
         if not image_data:
             return jsonify({"error": "No image data in request"}), 400
         
-        img = decode_image(image_data)
+        img = decode_image(image_data, target_size=CLASSIFIER_INPUT_SIZE)
         
         if img is None:
             return jsonify({
                 "error": "Failed to decode image"
             }), 400
         
-        result = advanced_classifier.predict(img)
+        # Cascade and full-pipeline results differ, so never share cache entries
+        cascade = resolve_cascade(data.get('cascade'))
+        cache_key = advanced_result_cache.key_for(img, variant=('cascade', cascade))
+        result = advanced_result_cache.get(cache_key)
+        
+        if result is None:
+            result = advanced_classifier.predict(img, cascade=cascade)
+            if 'error' not in result:
+                advanced_result_cache.put(cache_key, result)
         
         if 'error' in result:
             return jsonify(result), 400
@@ -175,6 +322,7 @@ def classify_waste_advanced():
             "tips": result['eco_tips'],
             "contamination_warnings": result['contamination_warnings'],
             "environmental_impact": impact,
+            "stages_run": result.get('stages_run', []),
             "mode": "advanced"
         }
         
@@ -185,6 +333,267 @@ def classify_waste_advanced():
         traceback.print_exc()
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+@app.route('/classify-waste/hybrid', methods=['POST'])
+@token_required
+def classify_waste_hybrid():
+    """Rule-based classification, with the CNN breaking low-confidence ties"""
+    try:
+        data = request.json
+        
+        if not data:
+            return jsonify({"error": "No JSON data received"}), 400
+        
+        image_data = data.get('image')
+        if not image_data:
+            return jsonify({"error": "No image data in request"}), 400
+        
+        img = decode_image(image_data, target_size=CLASSIFIER_INPUT_SIZE)
+        
+        if img is None:
+            return jsonify({
+                "error": "Failed to decode image"
+            }), 400
+        
+        # Cascade and full-pipeline results differ, so never share cache entries
+        cascade = resolve_cascade(data.get('cascade'))
+        cache_key = hybrid_result_cache.key_for(img, variant=('cascade', cascade))
+        result = hybrid_classifier.predict_cached(img, hybrid_result_cache, cache_key, cascade=cascade)
+        
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        user_id = request.user_id
+        
+        if user_id:
+            auth_manager.add_scan_record(
+                user_id, 
+                result['waste_type'], 
+                result['confidence'],
+                data.get('latitude'),
+                data.get('longitude')
+            )
+        
+        impact = impact_calculator.calculate_single_item_impact(
+            result['waste_type'],
+            result['confidence']
+        )
+        
+        response_data = {
+            "waste_type": result['waste_type'],
+            "category_name": result['category_name'],
+            "confidence": result['confidence'],
+            "subcategories": result['subcategories'],
+            "disposal_instructions": result['disposal_instructions'],
+            "recycling_code": result['recycling_code'],
+            "tips": result['eco_tips'],
+            "contamination_warnings": result['contamination_warnings'],
+            "environmental_impact": impact,
+            "stages_run": result.get('stages_run', []),
+            "decided_by": result['decided_by'],
+            "latency_ms": result['latency_ms'],
+            "mode": "hybrid"
+        }
+        
+        return jsonify(response_data), 200
+        
+    except Exception as e:
+        print(f"Hybrid classification error: {e}")
+        traceback.print_exc()
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@app.route('/classify-waste/regions', methods=['POST'])
+@token_required
+def classify_waste_regions():
+    """Classify every item in a photo of several pieces of waste"""
+    try:
+        data = request.json
+        
+        if not data:
+            return jsonify({"error": "No JSON data received"}), 400
+        
+        image_data = data.get('image')
+        if not image_data:
+            return jsonify({"error": "No image data in request"}), 400
+        
+        try:
+            window = float(data.get('window', 1 / 3))
+            stride = float(data.get('stride', window / 2))
+            min_confidence = float(data.get('min_confidence', 0.5))
+            check_region_grid(window, stride)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid region grid: {e}"}), 400
+        
+        # Every window is classified at the classifier input size
+        img = decode_image(image_data, target_size=int(round(CLASSIFIER_INPUT_SIZE / window)))
+        
+        if img is None:
+            return jsonify({
+                "error": "Failed to decode image"
+            }), 400
+        
+        result = advanced_classifier.predict_regions(
+            img,
+            window=window,
+            stride=stride,
+            min_confidence=min_confidence
+        )
+        
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        user_id = request.user_id
+        regions = []
+        
+        for region in result['regions']:
+            if user_id:
+                auth_manager.add_scan_record(
+                    user_id,
+                    region['waste_type'],
+                    region['confidence'],
+                    data.get('latitude'),
+                    data.get('longitude')
+                )
+            
+            region = dict(region)
+            region['environmental_impact'] = impact_calculator.calculate_single_item_impact(
+                region['waste_type'],
+                region['confidence']
+            )
+            regions.append(region)
+        
+        return jsonify({
+            "regions": regions,
+            "windows_evaluated": result['windows_evaluated'],
+            "stages_run": result['stages_run'],
+            "mode": "regions"
+        }), 200
+        
+    except Exception as e:
+        print(f"Region classification error: {e}")
+        traceback.print_exc()
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@app.route('/stream/start', methods=['POST'])
+@token_required
+def start_stream():
+    """Open a live classification session for camera frames"""
+    try:
+        data = request.json or {}
+        
+        try:
+            session = stream_sessions.start(
+                request.user_id,
+                max_fps=data.get('max_fps'),
+                window=data.get('window')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if session is None:
+            return jsonify({'error': 'Too many active stream sessions, try again later'}), 503
+        
+        return jsonify({
+            'session_id': session.id,
+            'max_fps': session.max_fps,
+            'window': session.window
+        }), 201
+    except Exception as e:
+        return jsonify({'error': f'Failed to start stream: {str(e)}'}), 500
+
+@app.route('/stream/<session_id>/frame', methods=['POST'])
+@token_required
+def classify_stream_frame(session_id):
+    """Classify one frame of a live session, smoothed over recent frames"""
+    try:
+        session = stream_sessions.get(session_id, request.user_id)
+        
+        if session is None:
+            return jsonify({'error': 'Stream session not found'}), 404
+        
+        # Reject early, before paying for decoding the frame
+        retry_after = session.retry_after()
+        if retry_after > 0:
+            session.frames_received += 1
+            session.frames_rate_limited += 1
+            return jsonify({
+                'error': 'Frame rate limit exceeded',
+                'retry_after_ms': int(retry_after * 1000) + 1
+            }), 429
+        
+        data = request.json
+        
+        if not data or not data.get('image'):
+            return jsonify({"error": "No image data in request"}), 400
+        
+        img = decode_image(data['image'], target_size=CLASSIFIER_INPUT_SIZE)
+        
+        if img is None:
+            return jsonify({
+                "error": "Failed to decode image"
+            }), 400
+        
+        result = session.process_frame(img)
+        
+        if result.get('rate_limited'):
+            return jsonify({
+                'error': 'Frame rate limit exceeded',
+                'retry_after_ms': result['retry_after_ms']
+            }), 429
+        
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        return jsonify({
+            "waste_type": result['waste_type'],
+            "category_name": result['category_name'],
+            "confidence": result['confidence'],
+            "disposal_instructions": result['disposal_instructions'],
+            "recycling_code": result['recycling_code'],
+            "frame_index": result['frame_index'],
+            "frame_unchanged": result['frame_unchanged'],
+            "frames_smoothed": result['frames_smoothed'],
+            "stages_run": result['stages_run'],
+            "mode": "stream"
+        }), 200
+        
+    except Exception as e:
+        print(f"Stream frame error: {e}")
+        traceback.print_exc()
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@app.route('/stream/<session_id>/stop', methods=['POST'])
+@token_required
+def stop_stream(session_id):
+    """Close a live classification session"""
+    session = stream_sessions.stop(session_id, request.user_id)
+    
+    if session is None:
+        return jsonify({'error': 'Stream session not found'}), 404
+    
+    return jsonify(session.stats()), 200
+
+@app.route('/analyze-product/ocr/<job_id>', methods=['GET'])
+@token_required
+def get_ocr_job(job_id):
+    """Result of OCR deferred by /analyze-product"""
+    job = product_analyzer.ocr_jobs.get(job_id, owner=request.user_id)
+    
+    if job is None:
+        return jsonify({"error": "OCR job not found"}), 404
+    
+    response_data = {
+        "job_id": job['job_id'],
+        "status": job['status']
+    }
+    
+    if job['status'] == 'done':
+        response_data['extracted_text'] = job['result']['extracted_text']
+        response_data['found_keywords'] = job['result']['found_keywords']
+    elif job['status'] == 'failed':
+        response_data['error'] = job['error']
+    
+    return jsonify(response_data), 200
+
 @app.route('/classify-waste/simple', methods=['POST'])
 @token_required
 def classify_waste_simple():
@@ -199,14 +608,23 @@ def classify_waste_simple():
         if not image_data:
             return jsonify({"error": "No image data in request"}), 400
         
-        img = decode_image(image_data)
+        if not simple_classifier.is_ready:
+            return jsonify({"error": "Model is still warming up, try again shortly"}), 503
+        
+        img = decode_image(image_data, target_size=CLASSIFIER_INPUT_SIZE)
         
         if img is None:
             return jsonify({
                 "error": "Failed to decode image"
             }), 400
         
-        result = simple_classifier.predict(img)
+        cache_key = simple_result_cache.key_for(img)
+        result = simple_result_cache.get(cache_key)
+        
+        if result is None:
+            result = simple_classifier.predict(img)
+            if 'error' not in result:
+                simple_result_cache.put(cache_key, result)
         
         if 'error' in result:
             return jsonify(result), 400
@@ -249,6 +667,10 @@ def analyze_product():
         if not image_data:
             return jsonify({"error": "No image data in request"}), 400
         
+        ocr_mode = data.get('ocr', 'auto')
+        if ocr_mode not in OCR_MODES:
+            return jsonify({"error": f"ocr must be one of {list(OCR_MODES)}"}), 400
+        
         img = decode_image(image_data)
         
         if img is None:
@@ -256,7 +678,7 @@ def analyze_product():
                 "error": "Failed to decode image"
             }), 400
         
-        result = product_analyzer.analyze_product(img)
+        result = product_analyzer.analyze_product(img, ocr_mode=ocr_mode, owner=request.user_id)
         
         if 'error' in result:
             return jsonify(result), 400
@@ -268,8 +690,12 @@ def analyze_product():
             "found_keywords": result.get('found_keywords', []),
             "extracted_text": result.get('extracted_text', ''),
             "recommendations": result.get('recommendations', []),
-            "analysis_method": "barcode" if result.get('barcode_detected') else "ocr"
+            "analysis_method": "barcode" if result.get('barcode_detected') else "ocr",
+            "ocr": result.get('ocr', 'ran')
         }
+        
+        if result.get('ocr_job_id'):
+            response_data['ocr_job_id'] = result['ocr_job_id']
 
         if result.get('product_info') and result['product_info'].get('found'):
             product_info = result['product_info']
@@ -406,6 +832,16 @@ def get_community_stats():
     stats = community_manager.get_impact_statistics()
     return jsonify(stats), 200
 
+@app.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get hit/miss counters of the classification result and product caches"""
+    return jsonify({
+        'advanced': advanced_result_cache.stats(),
+        'simple': simple_result_cache.stats(),
+        'hybrid': hybrid_result_cache.stats(),
+        'products': product_cache.stats()
+    }), 200
+
 @app.route('/verify-token', methods=['POST'])
 def verify_token():
     """Verify if a token is valid"""
@@ -468,11 +904,13 @@ def home():
         "version": "4.0",
         "endpoints": {
             "auth": ["/auth/register", "/auth/login", "/verify-token", "/debug-token"],
-            "classification": ["/classify-waste/advanced", "/classify-waste/simple"],
-            "analysis": ["/analyze-product"],
+            "classification": ["/classify-waste/advanced", "/classify-waste/simple", "/classify-waste/hybrid", "/classify-waste/regions"],
+            "streaming": ["/stream/start", "/stream/<session_id>/frame", "/stream/<session_id>/stop"],
+            "analysis": ["/analyze-product", "/analyze-product/ocr/<job_id>"],
             "user": ["/profile", "/impact"],
             "community": ["/leaderboard", "/challenges", "/community/stats"],
-            "info": ["/eco-tip", "/recycling-centers"]
+            "info": ["/eco-tip", "/recycling-centers"],
+            "monitoring": ["/health", "/ready", "/cache/stats", "/inference/stats", "/models/stats"]
         },
         "note": "Most endpoints require JWT token in Authorization header"
     })
@@ -487,11 +925,41 @@ def health_check():
             "community": "active",
             "impact_calculator": "active",
             "advanced_classifier": "loaded",
-            "simple_classifier": "loaded",
+            "simple_classifier": "ready" if simple_classifier.is_ready else "warming_up",
             "product_analyzer": "loaded"
         }
     })
 
+@app.route('/inference/stats', methods=['GET'])
+def inference_stats():
+    """Batching, hybrid path, barcode variant, product lookup and OCR job statistics"""
+    batching = isinstance(simple_classifier, MicroBatchingClassifier)
+    response = {
+        "batching": batching,
+        "hybrid": hybrid_classifier.stats(),
+        "barcode_variants": product_analyzer.barcode_variant_stats.stats(),
+        "product_lookup": product_analyzer.remote_lookup.stats(),
+        "ocr_jobs": product_analyzer.ocr_jobs.stats()
+    }
+    if batching:
+        response["simple_classifier"] = simple_classifier.stats()
+    
+    return jsonify(response), 200
+
+@app.route('/models/stats', methods=['GET'])
+def get_model_stats():
+    """Which shared models this worker has loaded, their load time and memory"""
+    return jsonify(model_registry.stats()), 200
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once the CNN model is loaded and warmed up"""
+    ready = simple_classifier.is_ready
+    return jsonify({
+        "ready": ready,
+        "simple_classifier": "ready" if ready else "warming_up"
+    }), 200 if ready else 503
+
 @app.after_request
 def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
@@ -509,6 +977,11 @@ if __name__ == '__main__':
     print("  GET  /profile")
     print("  POST /classify-waste/advanced")
     print("  POST /classify-waste/simple")
+    print("  POST /classify-waste/hybrid")
+    print("  POST /classify-waste/regions")
+    print("  POST /stream/start")
+    print("  POST /stream/<session_id>/frame")
+    print("  POST /stream/<session_id>/stop")
     print("  GET  /impact")
     print("  POST /challenges/join")
     print("\nPublic Endpoints:")
@@ -519,6 +992,10 @@ if __name__ == '__main__':
     print("  GET  /leaderboard")
     print("  GET  /challenges")
     print("  GET  /eco-tip")
+    print("  GET  /cache/stats")
+    print("  GET  /ready")
+    print("  GET  /inference/stats")
+    print("  GET  /models/stats")
     print("\nServer Configuration:")
     print("  Host: 0.0.0.0")
     print("  Port: 5500")
@@ -0,0 +1,298 @@
+"""
+Micro-benchmarks for the waste classifiers.
+
+Times every stage of AdvancedWasteClassifier (and WasteClassifier.predict
+when TensorFlow is available) over synthetic images of several sizes and
+textures, plus an optional directory of real photos. Results are written as
+JSON and can be compared against a stored baseline run:
+
+    python benchmark_classifiers.py --output bench.json
+    python benchmark_classifiers.py --images-dir photos/ --baseline bench.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import time
+import tracemalloc
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from advanced_classifier import IMAGE_SIZE, AdvancedWasteClassifier
+from feature_context import FeatureContext
+
+SYNTHETIC_SIZES = ((224, 224), (480, 640), (1080, 1920), (3024, 4032))
+SYNTHETIC_TEXTURES = ('solid', 'gradient', 'noise', 'blurred_noise', 'stripes', 'shapes')
+IMAGE_EXTENSIONS = ('*.jpg', '*.jpeg', '*.png', '*.bmp', '*.webp')
+
+
+def make_synthetic_image(texture, height, width, rng):
+    """Deterministic test image with a given texture"""
+    if texture == 'solid':
+        return np.full((height, width, 3), rng.integers(0, 256, 3), dtype=np.uint8)
+
+    if texture == 'gradient':
+        ramp = np.linspace(0, 255, width, dtype=np.float32)
+        image = np.empty((height, width, 3), dtype=np.uint8)
+        for channel, weight in enumerate(rng.uniform(0.3, 1.0, 3)):
+            image[:, :, channel] = (ramp * weight).astype(np.uint8)
+        return image
+
+    if texture == 'noise':
+        return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+    if texture == 'blurred_noise':
+        noise = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        return cv2.GaussianBlur(noise, (15, 15), 0)
+
+    if texture == 'stripes':
+        period = max(4, width // 40)
+        stripes = ((np.arange(width) // period) % 2 * 255).astype(np.uint8)
+        return np.repeat(np.tile(stripes, (height, 1))[:, :, None], 3, axis=2)
+
+    if texture == 'shapes':
+        image = np.full((height, width, 3), 200, dtype=np.uint8)
+        for _ in range(25):
+            center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            radius = int(rng.integers(5, max(6, min(height, width) // 6)))
+            color = tuple(int(c) for c in rng.integers(0, 256, 3))
+            cv2.circle(image, center, radius, color, -1)
+        return image
+
+    raise ValueError(f"Unknown texture '{texture}'")
+
+
+def load_image_set(sizes, images_dir=None, seed=0):
+    """Synthetic images for every size/texture pair, plus any real photos"""
+    rng = np.random.default_rng(seed)
+    images = []
+
+    for height, width in sizes:
+        for texture in SYNTHETIC_TEXTURES:
+            name = f"synthetic/{texture}_{width}x{height}"
+            images.append((name, make_synthetic_image(texture, height, width, rng)))
+
+    if images_dir:
+        paths = sorted(p for pattern in IMAGE_EXTENSIONS for p in glob.glob(os.path.join(images_dir, pattern)))
+        for path in paths:
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                print(f"Skipping unreadable image {path}")
+                continue
+            images.append((f"recorded/{os.path.basename(path)}", image))
+
+    return images
+
+
+def build_stages(classifier, cnn_classifier=None):
+    """
+    Stage name -> (prepare, run). `prepare` builds the stage input outside the
+    timed region; `run` is what gets timed. Stages start from a fresh
+    FeatureContext so cached planes do not hide the cost of a stage.
+    """
+    def unchanged(image):
+        return image
+
+    def resized(image):
+        return cv2.resize(image, (IMAGE_SIZE, IMAGE_SIZE))
+
+    def resized_gray(image):
+        return cv2.cvtColor(resized(image), cv2.COLOR_BGR2GRAY)
+
+    def extract_features(image):
+        return classifier._extract_features(image[None])
+
+    def detect_shapes(image):
+        return classifier._detect_shapes(FeatureContext(image))
+
+    def scoring(prepared):
+        features, contexts = prepared
+        return classifier._classify_by_features(features, contexts)
+
+    stages = {
+        'resize': (unchanged, resized),
+        'extract_features': (resized, extract_features),
+        'detect_shapes': (resized, detect_shapes),
+        'glcm': (resized_gray, classifier._calculate_glcm),
+        'lbp': (resized_gray, classifier._calculate_lbp),
+        'scoring': (lambda image: extract_features(resized(image)), scoring),
+        'advanced_predict': (unchanged, classifier.predict),
+    }
+
+    if cnn_classifier is not None:
+        stages['cnn_predict'] = (unchanged, cnn_classifier.predict)
+
+    return stages
+
+
+def time_call(func, arg, repeat, warmup):
+    for _ in range(warmup):
+        func(arg)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def peak_traced_memory(func, arg):
+    """Peak Python/NumPy heap allocated by one call, in bytes"""
+    tracemalloc.start()
+    try:
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def summarize(timings_s, image_count, peak_bytes):
+    timings_ms = np.array(timings_s) * 1000.0
+    total_s = float(np.sum(timings_s))
+    return {
+        'calls': len(timings_s),
+        'images': image_count,
+        'mean_ms': round(float(np.mean(timings_ms)), 4),
+        'p50_ms': round(float(np.percentile(timings_ms, 50)), 4),
+        'p90_ms': round(float(np.percentile(timings_ms, 90)), 4),
+        'p99_ms': round(float(np.percentile(timings_ms, 99)), 4),
+        'max_ms': round(float(np.max(timings_ms)), 4),
+        'images_per_sec': round(len(timings_s) / total_s, 2) if total_s > 0 else None,
+        'peak_traced_memory_bytes': int(peak_bytes),
+    }
+
+
+def load_cnn_classifier():
+    """Warmed-up WasteClassifier, or None when TensorFlow is not installed"""
+    import waste_classifier
+
+    if not waste_classifier.TENSORFLOW_AVAILABLE:
+        print("Skipping CNN stage: TensorFlow is not installed")
+        return None
+
+    cnn_classifier = waste_classifier.WasteClassifier()
+    # predict() reports failures as a result dict, which would otherwise be
+    # timed as if it were a prediction
+    result = cnn_classifier.predict(np.zeros((IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.uint8))
+    if 'error' in result:
+        raise RuntimeError(f"CNN warm-up prediction failed: {result['error']} (use --skip-cnn to skip it)")
+    return cnn_classifier
+
+
+def run_benchmark(images, repeat=5, warmup=1, include_cnn=True):
+    classifier = AdvancedWasteClassifier()
+    cnn_classifier = load_cnn_classifier() if include_cnn else None
+
+    stages = build_stages(classifier, cnn_classifier)
+
+    results = {}
+    for stage, (prepare, run) in stages.items():
+        print(f"Benchmarking {stage}...")
+        per_image = {}
+        all_timings = []
+        peak = 0
+
+        for name, image in images:
+            arg = prepare(image)
+            timings = time_call(run, arg, repeat, warmup)
+            image_peak = peak_traced_memory(run, arg)
+            per_image[name] = summarize(timings, 1, image_peak)
+            all_timings.extend(timings)
+            peak = max(peak, image_peak)
+
+        results[stage] = {
+            'overall': summarize(all_timings, len(images), peak),
+            'per_image': per_image,
+        }
+
+    return results
+
+
+def compare_with_baseline(current, baseline):
+    """p50 ratio of current over baseline for every stage present in both runs"""
+    comparison = {}
+    for stage, data in current['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base:
+            continue
+        base_p50 = base['overall']['p50_ms']
+        current_p50 = data['overall']['p50_ms']
+        comparison[stage] = {
+            'baseline_p50_ms': base_p50,
+            'current_p50_ms': current_p50,
+            'ratio': round(current_p50 / base_p50, 3) if base_p50 else None,
+        }
+    return comparison
+
+
+def parse_sizes(text):
+    sizes = []
+    for item in text.split(','):
+        width, height = item.lower().split('x')
+        sizes.append((int(height), int(width)))
+    return tuple(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the EcoLife waste classifiers")
+    parser.add_argument('--images-dir', help="directory of real photos to include")
+    parser.add_argument('--sizes', type=parse_sizes,
+                        default=SYNTHETIC_SIZES,
+                        help="synthetic image sizes as WxH,WxH (default: 224x224,640x480,1920x1080,4032x3024)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed calls per image and stage")
+    parser.add_argument('--warmup', type=int, default=1, help="untimed calls per image and stage")
+    parser.add_argument('--skip-cnn', action='store_true', help="do not benchmark WasteClassifier")
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write the JSON report")
+    parser.add_argument('--baseline', help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    images = load_image_set(args.sizes, args.images_dir)
+    print(f"Benchmarking {len(images)} images, {args.repeat} runs each")
+
+    stages = run_benchmark(images, args.repeat, args.warmup, include_cnn=not args.skip_cnn)
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+        },
+        'config': {
+            'repeat': args.repeat,
+            'warmup': args.warmup,
+            'images': [name for name, _ in images],
+        },
+        'stages': stages,
+        # ru_maxrss is reported in kilobytes on Linux
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['baseline_comparison'] = compare_with_baseline(report, json.load(f))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'stage':<20}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'img/s':>10}")
+    for stage, data in stages.items():
+        overall = data['overall']
+        print(f"{stage:<20}{overall['p50_ms']:>10.2f}{overall['p90_ms']:>10.2f}"
+              f"{overall['p99_ms']:>10.2f}{overall['images_per_sec'] or 0:>10.1f}")
+
+    for stage, data in report.get('baseline_comparison', {}).items():
+        print(f"{stage:<20} {data['ratio']}x baseline p50")
+
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import multiprocessing
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from advanced_classifier import AdvancedWasteClassifier
+
+# Classifier owned by the current worker process, built by _init_worker
+_worker_classifier = None
+
+
+def _init_worker(classifier_kwargs):
+    global _worker_classifier
+    _worker_classifier = AdvancedWasteClassifier(**classifier_kwargs)
+    # Warm up OpenCV and NumPy code paths before the first real request
+    _worker_classifier.predict(np.zeros((224, 224, 3), dtype=np.uint8))
+
+
+def _run_shared(method, name, shape, dtype, kwargs):
+    shm = shared_memory.SharedMemory(name=name)
+    # Attaching registers the segment with this worker's resource tracker,
+    # which would try to unlink it again on exit; the parent owns it.
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    image = None
+    try:
+        image = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        return getattr(_worker_classifier, method)(image, **kwargs)
+    finally:
+        # The view has to go before the segment can be closed
+        del image
+        shm.close()
+
+
+class ClassifierProcessPool:
+    """
+    Runs AdvancedWasteClassifier predictions in a pool of worker processes.
+
+    Every worker holds its own pre-warmed classifier, so concurrent requests
+    are no longer serialized on the GIL of the web process. Images travel
+    through shared memory instead of being pickled, and at most `max_queue`
+    tasks may be pending at once.
+    """
+
+    def __init__(self, pool_size=2, max_queue=16, timeout=10.0, start_method=None, **classifier_kwargs):
+        self.pool_size = pool_size
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._classifier_kwargs = classifier_kwargs
+        self._local_classifier = None
+
+        context = multiprocessing.get_context(start_method)
+        self._pool = context.Pool(pool_size, initializer=_init_worker, initargs=(classifier_kwargs,))
+        self._slots = threading.BoundedSemaphore(max_queue)
+
+        print(f"Classifier process pool started with {pool_size} workers")
+
+    def predict(self, image, **kwargs):
+        return self._run('predict', image, kwargs)
+
+    def predict_regions(self, image, **kwargs):
+        return self._run('predict_regions', image, kwargs)
+
+    def score_image(self, image, **kwargs):
+        return self._run('score_image', image, kwargs)
+
+    @property
+    def scoring_rules(self):
+        return self._local().scoring_rules
+
+    def result_from_scores(self, scores, stages_run):
+        # Only formats a result from precomputed scores, cheap enough to do here
+        return self._local().result_from_scores(scores, stages_run)
+
+    def _local(self):
+        if self._local_classifier is None:
+            self._local_classifier = AdvancedWasteClassifier(**self._classifier_kwargs)
+        return self._local_classifier
+
+    def _run(self, method, image, kwargs):
+        if not self._slots.acquire(blocking=False):
+            return self._error_result('Classifier queue is full, try again shortly')
+
+        image = np.ascontiguousarray(image)
+        shm = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+        shared = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)
+        shared[...] = image
+        del shared
+
+        def release(_):
+            shm.close()
+            shm.unlink()
+            self._slots.release()
+
+        try:
+            task = self._pool.apply_async(
+                _run_shared,
+                (method, shm.name, image.shape, image.dtype.str, kwargs),
+                callback=release,
+                error_callback=release
+            )
+        except Exception as e:
+            release(None)
+            return self._error_result(e)
+
+        try:
+            return task.get(self.timeout)
+        except multiprocessing.TimeoutError:
+            return self._error_result(f'Classification timed out after {self.timeout}s')
+        except Exception as e:
+            return self._error_result(e)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def _error_result(self, error):
+        return {
+            'error': str(error),
+            'waste_type': 'unknown',
+            'confidence': 0.0
+        }
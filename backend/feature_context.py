@@ -0,0 +1,48 @@
+from functools import cached_property
+
+import cv2
+
+
+class FeatureContext:
+    """
+    Per-image cache of the derived planes used by the feature stages.
+
+    Every plane is computed lazily on first access and then shared, so a
+    plane no stage asks for is never computed and none is computed twice.
+    Planes that were already computed elsewhere (e.g. for a whole batch) can
+    be passed in as keyword arguments.
+    """
+
+    def __init__(self, image, **planes):
+        self.image = image
+        self.__dict__.update(planes)
+
+    @cached_property
+    def gray(self):
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+
+    @cached_property
+    def hsv(self):
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV)
+
+    @cached_property
+    def lab(self):
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2LAB)
+
+    @cached_property
+    def edges(self):
+        return cv2.Canny(self.gray, 50, 150)
+
+    @cached_property
+    def laplacian(self):
+        return cv2.Laplacian(self.gray, cv2.CV_64F)
+
+    @cached_property
+    def histogram(self):
+        hist = cv2.calcHist([self.gray], [0], None, [64], [0, 256])
+        return cv2.normalize(hist, hist).flatten()
+
+    @cached_property
+    def contours(self):
+        contours, _ = cv2.findContours(self.edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return contours
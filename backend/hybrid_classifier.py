@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Advanced categories each CNN class speaks for. Hazardous waste and e-waste
+# have no CNN counterpart and are only ever decided by the rules.
+CNN_CATEGORY_MAP = {
+    'recyclable': ('recyclable_paper', 'recyclable_plastic', 'recyclable_glass', 'recyclable_metal'),
+    'organic': ('organic_food', 'organic_yard'),
+    'landfill': ('landfill_general',),
+}
+
+LATENCY_WINDOW = 1000
+
+# How one request was answered; never stored in a result cache
+PER_REQUEST_FIELDS = ('decided_by', 'latency_ms')
+
+
+class HybridWasteClassifier:
+    """
+    Rule-based scoring first, the CNN only for low-confidence images.
+
+    When the rule confidence is below `confidence_threshold`, the CNN class
+    probabilities are spread over the advanced categories they map to and
+    added to the rule scores as up to `cnn_weight` points, which breaks
+    near-ties between the rule categories.
+    """
+
+    def __init__(self, rule_classifier, cnn_classifier, confidence_threshold=0.6, cnn_weight=30.0):
+        self.rule_classifier = rule_classifier
+        self.cnn_classifier = cnn_classifier
+        self.confidence_threshold = confidence_threshold
+        self.cnn_weight = cnn_weight
+
+        self._latencies = {path: deque(maxlen=LATENCY_WINDOW) for path in ('rules', 'cnn', 'cache')}
+        self._decisions = {'rules': 0, 'rules+cnn': 0, 'cache': 0}
+        self._stats_lock = threading.Lock()
+
+    def predict(self, image, cascade=None):
+        start = time.perf_counter()
+        scored = self.rule_classifier.score_image(image, cascade=cascade)
+        if 'error' in scored:
+            return scored
+
+        scores = scored['scores']
+        result = self.rule_classifier.result_from_scores(scores, scored['stages_run'])
+        latency = {'rules': self._record('rules', start)}
+
+        decided_by = 'rules'
+        if result['confidence'] < self.confidence_threshold and self.cnn_classifier.is_ready:
+            start = time.perf_counter()
+            cnn_result = self.cnn_classifier.predict(image)
+            latency['cnn'] = self._record('cnn', start)
+
+            if 'error' not in cnn_result:
+                combined = scores + self._cnn_points(cnn_result['probabilities'])
+                result = self.rule_classifier.result_from_scores(combined, scored['stages_run'])
+                result['cnn_waste_type'] = cnn_result['waste_type']
+                decided_by = 'rules+cnn'
+
+        with self._stats_lock:
+            self._decisions[decided_by] += 1
+
+        result['decided_by'] = decided_by
+        result['latency_ms'] = latency
+        return result
+
+    def predict_cached(self, image, cache, key, cascade=None):
+        """
+        predict() through a result cache. Hits are reported and counted as
+        decided_by 'cache' with their own latency.
+        """
+        start = time.perf_counter()
+        cached = cache.get(key)
+        if cached is not None:
+            result = dict(cached)
+            result['decided_by'] = 'cache'
+            result['latency_ms'] = {'cache': self._record('cache', start)}
+            with self._stats_lock:
+                self._decisions['cache'] += 1
+            return result
+
+        result = self.predict(image, cascade=cascade)
+        if 'error' not in result:
+            cache.put(key, {name: value for name, value in result.items() if name not in PER_REQUEST_FIELDS})
+        return result
+
+    def _cnn_points(self, probabilities):
+        categories = self.rule_classifier.scoring_rules.categories
+        points = np.zeros(len(categories))
+        for cnn_class, probability in probabilities.items():
+            for category in CNN_CATEGORY_MAP.get(cnn_class, ()):
+                points[categories.index(category)] = probability * self.cnn_weight
+        return points
+
+    def _record(self, path, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        with self._stats_lock:
+            self._latencies[path].append(elapsed_ms)
+        return round(elapsed_ms, 2)
+
+    def stats(self):
+        with self._stats_lock:
+            latency = {}
+            for path, samples in self._latencies.items():
+                if not samples:
+                    continue
+                values = np.array(samples)
+                latency[path] = {
+                    'calls': len(values),
+                    'mean_ms': round(float(values.mean()), 2),
+                    'p50_ms': round(float(np.percentile(values, 50)), 2),
+                    'p90_ms': round(float(np.percentile(values, 90)), 2),
+                }
+
+            total = sum(self._decisions.values())
+            return {
+                'confidence_threshold': self.confidence_threshold,
+                'cnn_weight': self.cnn_weight,
+                'decisions': dict(self._decisions),
+                'cnn_rate': round(self._decisions['rules+cnn'] / total, 3) if total else 0.0,
+                'latency': latency,
+            }
@@ -0,0 +1,135 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, TimeoutError
+
+import numpy as np
+
+
+def _power_of_two_bucket(value):
+    """Histogram bucket label: 0, 1, 2, 3-4, 5-8, 9-16, ..."""
+    if value <= 2:
+        return str(value)
+    upper = 1 << (value - 1).bit_length()
+    return f"{upper // 2 + 1}-{upper}"
+
+
+class MicroBatchingClassifier:
+    """
+    Groups concurrent WasteClassifier requests into batched forward passes.
+
+    Request threads preprocess their own image and enqueue it. One worker
+    thread collects up to `max_batch_size` images, waiting at most
+    `max_wait_ms` after the first one arrives, runs a single forward pass
+    and hands each request its own result.
+    """
+
+    def __init__(self, classifier, max_batch_size=16, max_wait_ms=5.0, timeout=10.0):
+        self.classifier = classifier
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queue_depths = Counter()
+        self._requests = 0
+        self._batches = 0
+        self._timeouts = 0
+
+        self._start_worker()
+        if hasattr(os, 'register_at_fork'):
+            # Threads do not survive fork; prefork workers need their own
+            os.register_at_fork(after_in_child=self._start_worker)
+
+    def _start_worker(self):
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='cnn-micro-batcher', daemon=True)
+        self._worker.start()
+
+    @property
+    def is_ready(self):
+        return self.classifier.is_ready
+
+    def predict(self, image):
+        try:
+            item = self.classifier.preprocess(image)
+        except Exception as e:
+            return self.classifier.error_result(e)
+
+        future = Future()
+        self._queue.put((item, future))
+
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            # Drops the request from its batch unless inference has started
+            future.cancel()
+            with self._stats_lock:
+                self._timeouts += 1
+            return self.classifier.error_result(f"inference timed out after {self.timeout}s")
+        except Exception as e:
+            return self.classifier.error_result(e)
+
+    def _collect(self):
+        """Block for the first request, then gather more until full or the wait expires"""
+        batch = [self._queue.get()]
+        # Requests already waiting when the batch opens
+        depth = self._queue.qsize() + 1
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch, depth
+
+    def _run(self):
+        while True:
+            batch, depth = self._collect()
+            # Requests that timed out while queued were cancelled
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            futures = [future for _, future in batch]
+
+            try:
+                if self.classifier.model is None:
+                    self.classifier.load_model()
+                probabilities = self.classifier._infer(np.stack([item for item, _ in batch]))
+                for future, p in zip(futures, probabilities):
+                    future.set_result(self.classifier.result_from_probabilities(p))
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+            with self._stats_lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._batch_sizes[len(batch)] += 1
+                self._queue_depths[_power_of_two_bucket(depth)] += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'requests': self._requests,
+                'batches': self._batches,
+                'mean_batch_size': round(self._requests / self._batches, 2) if self._batches else 0.0,
+                'pending': self._queue.qsize(),
+                'timeouts': self._timeouts,
+                'batch_size_histogram': {str(size): n for size, n in sorted(self._batch_sizes.items())},
+                'queue_depth_histogram': dict(
+                    sorted(self._queue_depths.items(), key=lambda item: int(item[0].split('-')[0]))
+                ),
+            }
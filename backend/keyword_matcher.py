@@ -0,0 +1,116 @@
+import json
+import os
+import re
+from collections import namedtuple
+
+DEFAULT_LEXICONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keyword_lexicons.json')
+
+# Words, keeping hyphenated and apostrophe compounds ("non-recyclable") whole
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[-'][^\W_]+)*")
+
+# `term` is the lexicon's spelling; start/end locate the match in the text
+KeywordMatch = namedtuple('KeywordMatch', ['term', 'lexicon', 'weight', 'start', 'end'])
+
+
+class KeywordMatcher:
+    """
+    Whole-word matcher for many weighted keyword lexicons at once.
+
+    Text is tokenized once and every run of up to `max_words` tokens is
+    looked up in a single phrase table, so a scan costs the same however
+    many terms the lexicons hold. Each lexicon takes its own longest
+    matches, so a phrase in one lexicon never hides the terms of another
+    inside it. Terms only match whole words: "pet" does
+    not match "carpet" and "plastic" does not match "non-plastic". A
+    trailing plural "s" is tolerated ("plastics" matches "plastic").
+    """
+
+    def __init__(self, lexicons):
+        self.lexicons = {name: dict(terms) for name, terms in lexicons.items()}
+        # phrase -> [(lexicon, term, weight, rank of the term in its lexicon)]
+        self._phrases = {}
+        self.max_words = 1
+
+        for lexicon, terms in self.lexicons.items():
+            for rank, (term, weight) in enumerate(terms.items()):
+                words = TOKEN_PATTERN.findall(term.lower())
+                if not words:
+                    raise ValueError(f"Empty keyword in lexicon '{lexicon}'")
+                self._phrases.setdefault(' '.join(words), []).append((lexicon, term, weight, rank))
+                self.max_words = max(self.max_words, len(words))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            return cls(json.load(f)['lexicons'])
+
+    def _lookup(self, phrase):
+        entries = self._phrases.get(phrase, [])
+        if phrase.endswith('s'):
+            # The singular counts for lexicons without the plural spelling
+            exact = {entry[0] for entry in entries}
+            entries = entries + [
+                entry for entry in self._phrases.get(phrase[:-1], []) if entry[0] not in exact
+            ]
+        return entries
+
+    def _scan_entries(self, text):
+        tokens = [(m.group().lower(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text)]
+        # Token index from which each lexicon may match again
+        free_from = dict.fromkeys(self.lexicons, 0)
+
+        for i in range(len(tokens)):
+            # Longest phrase first, so "zero waste" wins over "waste" within
+            # a lexicon while other lexicons still see "waste"
+            for length in range(min(self.max_words, len(tokens) - i), 0, -1):
+                phrase = ' '.join(token for token, _, _ in tokens[i:i + length])
+                entries = [entry for entry in self._lookup(phrase) if free_from[entry[0]] <= i]
+                if entries:
+                    for entry in entries:
+                        free_from[entry[0]] = i + length
+                    yield entries, tokens[i][1], tokens[i + length - 1][2]
+
+    def scan(self, text):
+        """Every keyword occurrence in the text, in text order"""
+        return [
+            KeywordMatch(term, lexicon, weight, start, end)
+            for entries, start, end in self._scan_entries(text)
+            for lexicon, term, weight, _ in entries
+        ]
+
+    def find(self, text, lexicons=None):
+        """
+        {lexicon: {term: weight}} of the distinct keywords found, each
+        lexicon's terms in the order the lexicon lists them
+        """
+        names = list(lexicons) if lexicons is not None else list(self.lexicons)
+        found = {name: {} for name in names}
+
+        for entries, _, _ in self._scan_entries(text):
+            for lexicon, term, weight, rank in entries:
+                if lexicon in found:
+                    found[lexicon][term] = (rank, weight)
+
+        return {
+            name: {term: weight for term, (_, weight) in sorted(terms.items(), key=lambda item: item[1][0])}
+            for name, terms in found.items()
+        }
+
+
+def load_keyword_matcher(path=None):
+    """
+    Load and compile keyword lexicons: `path`, else the file named by
+    ECOLIFE_KEYWORD_LEXICONS, else the bundled ones
+    """
+    return KeywordMatcher.from_file(path or os.environ.get('ECOLIFE_KEYWORD_LEXICONS') or DEFAULT_LEXICONS_PATH)
+
+
+_default_matcher = None
+
+
+def get_keyword_matcher():
+    """Matcher for the configured lexicons, compiled once per process"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = load_keyword_matcher()
+    return _default_matcher
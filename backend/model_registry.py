@@ -0,0 +1,143 @@
+import os
+import resource
+import threading
+import time
+
+
+def _current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # No procfs (macOS): peak RSS, which is in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ModelRegistry:
+    """
+    Process-wide home for heavy models, so every component shares one
+    instance of each.
+
+    Models are registered with a zero-argument loader and built on first
+    get(), or up front with preload(). Preloading in a parent process
+    before a prefork server forks its workers lets them share the model
+    pages copy-on-write instead of each loading its own copy. Loads that
+    preload_async() had not finished when a process forked are resumed
+    in the child, whose copy of the loading thread does not run.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._info = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        # Names preload_async() was asked for and has not loaded yet
+        self._pending = set()
+        self._resume_registered = False
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def register(self, name, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered as '{name}'")
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+
+            print(f"Loading model '{name}'...")
+            rss_before = _current_rss()
+            start = time.perf_counter()
+
+            model = self._loaders[name]()
+
+            load_seconds = time.perf_counter() - start
+            self._info[name] = {
+                'load_seconds': round(load_seconds, 3),
+                # Approximate: anything else allocated meanwhile is counted too
+                'rss_delta_bytes': max(0, _current_rss() - rss_before),
+                'loaded_at': time.time(),
+                'loaded_in_pid': os.getpid(),
+            }
+            self._models[name] = model
+            print(f"Model '{name}' loaded in {load_seconds:.2f}s")
+            return model
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def preload(self, names=None):
+        """Load the given models (all registered ones by default) now"""
+        for name in (names or list(self._loaders)):
+            self.get(name)
+
+    def preload_async(self, names=None):
+        names = list(names or self._loaders)
+        with self._lock:
+            self._pending.update(names)
+            register_resume = not self._resume_registered and hasattr(os, 'register_at_fork')
+            self._resume_registered = True
+        if register_resume:
+            # Registered on first use, after the fork hooks of models built
+            # before it, so they have reset their own locks by the time the
+            # child resumes loading them
+            os.register_at_fork(after_in_child=self._resume_pending)
+
+        thread = threading.Thread(target=self._preload_pending, args=(names,), name='model-preload', daemon=True)
+        thread.start()
+        return thread
+
+    def _preload_pending(self, names):
+        for name in names:
+            self.get(name)
+            with self._lock:
+                self._pending.discard(name)
+
+    def _after_fork(self):
+        # A lock held by a loading thread in the parent would never be
+        # released in the child; loaded models themselves stay shared
+        self._lock = threading.Lock()
+        self._locks = {name: threading.Lock() for name in self._loaders}
+
+    def _resume_pending(self):
+        pending = [name for name in self._pending if name not in self._models]
+        self._pending = set()
+        if pending:
+            print(f"Resuming model preload after fork: {', '.join(pending)}")
+            self.preload_async(pending)
+
+    def stats(self):
+        return {
+            'pid': os.getpid(),
+            'rss_bytes': _current_rss(),
+            'models': {
+                name: dict(loaded=name in self._models, **self._info.get(name, {}))
+                for name in self._loaders
+            },
+        }
+
+
+def _load_easyocr_reader():
+    import easyocr
+    return easyocr.Reader(['en'])
+
+
+model_registry = ModelRegistry()
+model_registry.register('easyocr_en', _load_easyocr_reader)
+
+
+def get_model(name):
+    return model_registry.get(name)
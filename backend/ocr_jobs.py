@@ -0,0 +1,115 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+
+def downscale(image, max_side):
+    """Copy of the image with its longest side at most `max_side` pixels"""
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return image.copy()
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+class OcrJobQueue:
+    """
+    Background OCR jobs whose results clients fetch later.
+
+    `run` is the expensive function image -> result dict. Jobs run on a
+    small thread pool, finished jobs are kept for `ttl` seconds and at most
+    `max_jobs` jobs are remembered, oldest dropped first; a dropped job
+    that has not started is cancelled. At most `max_pending` jobs may be
+    queued or running, each holding an image downscaled to `max_side`
+    pixels, so queued work and memory stay bounded under bursts.
+    """
+
+    def __init__(self, run, workers=1, max_jobs=500, max_pending=32, ttl=600, max_side=1280):
+        self.run = run
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.max_side = max_side
+        self._jobs = OrderedDict()
+        # job_id -> Future of every job not yet finished
+        self._futures = {}
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr-job')
+
+    def submit(self, image, owner=None):
+        """Queue OCR of the image; the job id, or None when too many jobs are pending"""
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'owner': owner,
+            'status': 'pending',
+            'created_at': time.time(),
+            'finished_at': None,
+            'result': None,
+            'error': None,
+        }
+        image = downscale(image, self.max_side)
+
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                self._rejected += 1
+                return None
+
+            self._expire()
+            future = self._executor.submit(self._execute, job, image)
+            self._futures[job_id] = future
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                evicted_id, _ = self._jobs.popitem(last=False)
+                evicted = self._futures.get(evicted_id)
+                if evicted is not None:
+                    evicted.cancel()
+
+        # Outside the lock: the callback runs right here if the job has
+        # already finished
+        future.add_done_callback(lambda _: self._futures.pop(job_id, None))
+        return job_id
+
+    def _execute(self, job, image):
+        job['status'] = 'running'
+        try:
+            job['result'] = self.run(image)
+            job['status'] = 'done'
+        except Exception as e:
+            print(f"OCR job {job['job_id']} failed: {e}")
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        job['finished_at'] = time.time()
+
+    def get(self, job_id, owner=None):
+        """Job state without the owner, or None for unknown jobs and other users' jobs"""
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            if job is None or job['owner'] != owner:
+                return None
+            return {key: value for key, value in job.items() if key != 'owner'}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._futures),
+                'max_pending': self.max_pending,
+                'jobs': len(self._jobs),
+                'rejected': self._rejected,
+            }
+
+    def _expire(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job['finished_at'] is not None and now - job['finished_at'] > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
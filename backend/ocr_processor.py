@@ -1,9 +1,13 @@
-import easyocr
 import re
 
+from model_registry import get_model
+from keyword_matcher import get_keyword_matcher
+
 class OCRProcessor:
-    def __init__(self):
-        self.reader = easyocr.Reader(['en'])
+    @property
+    def reader(self):
+        """EasyOCR reader shared with ProductAnalyzer"""
+        return get_model('easyocr_en')
         
     def extract_text(self, image_path):
         """Extract text from image using OCR"""
@@ -17,36 +21,13 @@ class OCRProcessor:
     
     def analyze_product_impact(self, text):
         """Simple analysis of product environmental impact"""
-        text_lower = text.lower()
-        
-        eco_keywords = {
-            'organic': 2,
-            'recyclable': 2, 
-            'biodegradable': 2,
-            'compostable': 2,
-            'sustainable': 2,
-            'natural': 1,
-            'eco': 1,
-            'green': 1
-        }
-        
-        negative_keywords = {
-            'plastic': -1,
-            'chemical': -1,
-            'toxic': -2,
-            'pollution': -2
-        }
+        found = get_keyword_matcher().find(text, ('impact_positive', 'impact_negative'))
         
         score = 0
         found_keywords = []
         
-        for keyword, points in eco_keywords.items():
-            if keyword in text_lower:
-                score += points
-                found_keywords.append(keyword)
-                
-        for keyword, points in negative_keywords.items():
-            if keyword in text_lower:
+        for lexicon in ('impact_positive', 'impact_negative'):
+            for keyword, points in found[lexicon].items():
                 score += points
                 found_keywords.append(keyword)
         
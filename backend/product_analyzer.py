@@ -1,83 +1,205 @@
-import easyocr
 import cv2
 import numpy as np
 from pyzbar import pyzbar
-import requests
 import re
+import threading
+
+from product_cache import ProductCache
+from product_catalog import ProductCatalog
+from product_lookup import HedgedLookup, create_http_session
+from ocr_jobs import OcrJobQueue
+from model_registry import get_model
+from keyword_matcher import get_keyword_matcher
+
+# Barcode preprocessing variants, in their default order
+BARCODE_VARIANTS = ('gray', 'clahe', 'blur', 'sharpen', 'adaptive_threshold')
+
+# A validated barcode at least this good ends the search over variants
+EARLY_EXIT_QUALITY = 50
+
+# auto: skip OCR when the barcode already found the product
+# deferred: in that case run it as a background job instead
+# always: run it inline on every image
+OCR_MODES = ('auto', 'deferred', 'always')
+
+# Connect and read timeouts of a single product API request
+HTTP_TIMEOUT = (3.05, 10)
+
+def http_error_result(source, response):
+    """
+    Lookup result for a non-200, non-404 answer. Rate limits and outages
+    say nothing about the product, so the error keeps it from being cached
+    or taken as a final "not found".
+    """
+    print(f"{source} returned HTTP {response.status_code}")
+    return {'found': False, 'source': source, 'error': f'HTTP {response.status_code}'}
+
+SHARPEN_KERNEL = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
+
+def build_barcode_variant(name, gray):
+    """One preprocessed version of a grayscale image for barcode decoding"""
+    if name == 'gray':
+        return gray
+    if name == 'clahe':
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        return clahe.apply(gray)
+    if name == 'blur':
+        return cv2.GaussianBlur(gray, (3, 3), 0)
+    if name == 'sharpen':
+        return cv2.filter2D(gray, -1, SHARPEN_KERNEL)
+    if name == 'adaptive_threshold':
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+                                     cv2.THRESH_BINARY, 11, 2)
+    raise ValueError(f"Unknown barcode preprocessing variant '{name}'")
+
+# Barcode localisation runs on a copy at most this wide
+LOCALISATION_WIDTH = 640
+
+# Regions narrower than this are upscaled before decoding, up to 4x
+ROI_MIN_WIDTH = 400
+ROI_MAX_UPSCALE = 4.0
+
+def locate_barcode_regions(gray, max_regions=3, padding=0.1):
+    """
+    Candidate barcode boxes (x, y, w, h) in full-resolution coordinates,
+    largest first.
+
+    Barcodes are areas of strong gradient in one direction only, so the
+    difference of the Scharr gradient magnitudes along x and y is high over
+    vertical bars (and very negative over horizontal ones). Closing with a
+    kernel wider than the bar gaps merges the bars into one blob per code.
+    """
+    height, width = gray.shape[:2]
+    scale = min(1.0, LOCALISATION_WIDTH / width)
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+    small_area = small.shape[0] * small.shape[1]
+    
+    grad_x = np.abs(cv2.Scharr(small, cv2.CV_32F, 1, 0))
+    grad_y = np.abs(cv2.Scharr(small, cv2.CV_32F, 0, 1))
+    difference = grad_x - grad_y
+    
+    candidates = []
+    # Vertical bars (the usual orientation), then a code rotated by 90 degrees
+    for gradient, kernel_size in ((difference, (21, 7)), (-difference, (7, 21))):
+        gradient = cv2.convertScaleAbs(np.clip(gradient, 0, None), alpha=255.0 / max(float(gradient.max()), 1.0))
+        gradient = cv2.blur(gradient, (9, 9))
+        _, mask = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, kernel_size))
+        mask = cv2.erode(mask, None, iterations=4)
+        mask = cv2.dilate(mask, None, iterations=4)
+        
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            bx, by, bw, bh = cv2.boundingRect(contour)
+            # Ignore specks and blobs covering most of the frame
+            if 0.005 * small_area <= bw * bh <= 0.9 * small_area:
+                candidates.append((bw * bh, bx, by, bw, bh))
+    
+    regions = []
+    for _, bx, by, bw, bh in sorted(candidates, reverse=True)[:max_regions]:
+        pad_x = bw * padding
+        pad_y = bh * padding
+        x0 = max(0, int((bx - pad_x) / scale))
+        y0 = max(0, int((by - pad_y) / scale))
+        x1 = min(width, int(np.ceil((bx + bw + pad_x) / scale)))
+        y1 = min(height, int(np.ceil((by + bh + pad_y) / scale)))
+        regions.append((x0, y0, x1 - x0, y1 - y0))
+    
+    return regions
+
+class BarcodeVariantStats:
+    """Per-variant decode attempts and hits, used to try likely winners first"""
+    
+    def __init__(self, variants=BARCODE_VARIANTS):
+        self.variants = tuple(variants)
+        self.attempts = dict.fromkeys(self.variants, 0)
+        self.hits = dict.fromkeys(self.variants, 0)
+        self._lock = threading.Lock()
+    
+    def record(self, name, hit):
+        with self._lock:
+            self.attempts[name] += 1
+            if hit:
+                self.hits[name] += 1
+    
+    def hit_rate(self, name):
+        # Smoothed, so untried variants start at 0.5 instead of 0 or 1
+        return (self.hits[name] + 1) / (self.attempts[name] + 2)
+    
+    def ordered(self):
+        """Variants by descending hit rate, ties kept in the default order"""
+        with self._lock:
+            return sorted(self.variants, key=lambda name: -self.hit_rate(name))
+    
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'attempts': self.attempts[name],
+                    'hits': self.hits[name],
+                    'hit_rate': round(self.hit_rate(name), 3)
+                }
+                for name in self.variants
+            }
 
 class ProductAnalyzer:
-    def __init__(self):
-        self.reader = easyocr.Reader(['en'])
+    def __init__(self, product_cache=None, product_catalog=None, lookup_timeout=10.0):
         self.barcode_api_key = None
+        self.keyword_matcher = get_keyword_matcher()
+        self.http = create_http_session()
+        self.remote_lookup = HedgedLookup({
+            'open_food_facts': self.fetch_from_open_food_facts,
+            'barcode_lookup': self.fetch_from_barcode_lookup
+        }, timeout=lookup_timeout)
+        self.ocr_jobs = OcrJobQueue(self.extract_text_with_keywords)
+        self.product_cache = product_cache or ProductCache()
+        self.product_catalog = product_catalog or ProductCatalog()
+        self.barcode_variant_stats = BarcodeVariantStats()
         
+    @property
+    def reader(self):
+        """EasyOCR reader shared through the model registry, loaded on first use"""
+        return get_model('easyocr_en')
+    
     def preprocess_image_for_barcode(self, image):
         """Enhanced image preprocessing for better barcode detection"""
         try:
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image
-            
-            processed_images = []
-            
-         
-            processed_images.append(gray)
-            
-           
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            enhanced = clahe.apply(gray)
-            processed_images.append(enhanced)
-            
-        
-            blurred = cv2.GaussianBlur(gray, (3, 3), 0)
-            processed_images.append(blurred)
-            
-        
-            kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-            sharpened = cv2.filter2D(gray, -1, kernel)
-            processed_images.append(sharpened)
-            
-    
-            thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                         cv2.THRESH_BINARY, 11, 2)
-            processed_images.append(thresh)
-            
-            return processed_images
+            gray = self._to_gray(image)
+            return [build_barcode_variant(name, gray) for name in BARCODE_VARIANTS]
             
         except Exception as e:
             print(f"Image preprocessing error: {e}")
             return [gray] if 'gray' in locals() else [image]
     
-    def detect_and_decode_barcode(self, image):
-        """Enhanced barcode detection with multiple preprocessing techniques"""
+    def _to_gray(self, image):
+        if len(image.shape) == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
+    
+    def detect_and_decode_barcode(self, image, min_quality=EARLY_EXIT_QUALITY, exhaustive=False):
+        """
+        Decode barcodes in the regions that look like barcodes, falling back
+        to the whole frame when localisation finds none that decode.
+
+        Preprocessing variants are built lazily, in order of their historical
+        hit rate, and the search stops at the first validated barcode of at
+        least `min_quality`.
+        """
         try:
-            processed_images = self.preprocess_image_for_barcode(image)
+            gray = self._to_gray(image)
             
             all_barcodes = []
             
-            for i, processed_img in enumerate(processed_images):
-                try:
+            for region in locate_barcode_regions(gray):
+                found = self._decode_barcode_region(gray, region, min_quality, exhaustive)
+                all_barcodes.extend(found)
+                
+                if not exhaustive and any(b['quality_score'] >= min_quality for b in found):
+                    break
             
-                    barcodes = pyzbar.decode(processed_img)
-                    
-                    for barcode in barcodes:
-                        barcode_data = barcode.data.decode('utf-8')
-                        barcode_type = barcode.type
-                        
-                     
-                        if self.validate_barcode_format(barcode_data, barcode_type):
-                            barcode_info = {
-                                'data': barcode_data,
-                                'type': barcode_type,
-                                'rect': barcode.rect,
-                                'preprocessing_method': i,
-                                'quality_score': self.calculate_barcode_quality(barcode, processed_img)
-                            }
-                            all_barcodes.append(barcode_info)
-                            
-                except Exception as e:
-                    print(f"Barcode detection attempt {i} failed: {e}")
-                    continue
+            if not all_barcodes:
+                all_barcodes = self._decode_barcode_region(gray, None, min_quality, exhaustive)
             
            
             unique_barcodes = self.remove_duplicate_barcodes(all_barcodes)
@@ -90,6 +212,70 @@ class ProductAnalyzer:
             print(f"Barcode detection error: {e}")
             return []
     
+    def _decode_barcode_region(self, gray, region, min_quality, exhaustive):
+        """
+        Decode one (x, y, w, h) region of the frame, or the whole frame for
+        None. Small regions are upscaled first; reported rects and quality
+        scores are always in full-frame coordinates.
+        """
+        x, y = 0, 0
+        scale = 1.0
+        crop = gray
+        
+        if region is not None:
+            x, y, w, h = region
+            crop = gray[y:y + h, x:x + w]
+            scale = min(ROI_MAX_UPSCALE, max(1.0, ROI_MIN_WIDTH / w))
+            if scale > 1.0:
+                crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        
+        all_barcodes = []
+        
+        for name in self.barcode_variant_stats.ordered():
+            try:
+                processed_img = build_barcode_variant(name, crop)
+                barcodes = pyzbar.decode(processed_img)
+                
+                found = []
+                for barcode in barcodes:
+                    barcode_data = barcode.data.decode('utf-8')
+                    barcode_type = barcode.type
+                    
+                    rect = barcode.rect
+                    if region is not None:
+                        rect = pyzbar.Rect(
+                            left=x + int(rect.left / scale),
+                            top=y + int(rect.top / scale),
+                            width=int(rect.width / scale),
+                            height=int(rect.height / scale)
+                        )
+                        barcode = barcode._replace(rect=rect)
+                    
+                 
+                    if self.validate_barcode_format(barcode_data, barcode_type):
+                        barcode_info = {
+                            'data': barcode_data,
+                            'type': barcode_type,
+                            'rect': rect,
+                            'preprocessing_method': BARCODE_VARIANTS.index(name),
+                            'preprocessing': name,
+                            'localised': region is not None,
+                            'quality_score': self.calculate_barcode_quality(barcode, gray)
+                        }
+                        found.append(barcode_info)
+                
+                self.barcode_variant_stats.record(name, bool(found))
+                all_barcodes.extend(found)
+                
+                if not exhaustive and any(b['quality_score'] >= min_quality for b in found):
+                    break
+                        
+            except Exception as e:
+                print(f"Barcode detection attempt with {name} failed: {e}")
+                continue
+        
+        return all_barcodes
+    
     def validate_barcode_format(self, barcode_data, barcode_type):
         """Validate barcode format and checksum"""
         try:
@@ -207,18 +393,33 @@ class ProductAnalyzer:
         return list(unique_barcodes.values())
     
     def fetch_product_info_from_barcode(self, barcode):
-        """Enhanced product information fetching with multiple data sources"""
+        """Product information for a barcode, from local data when possible"""
         try:
-            product_info = self.fetch_from_open_food_facts(barcode)
-            if product_info['found']:
+            product_info = self.product_catalog.lookup(barcode)
+            if product_info is not None:
                 return product_info
-            
-
-            product_info = self.fetch_from_barcode_lookup(barcode)
-            if product_info['found']:
-                return product_info
-            
-            return {'found': False, 'source': 'none'}
+        except Exception as e:
+            print(f"Product catalog lookup error: {e}")
+        
+        cached = self.product_cache.get(barcode)
+        if cached is not None:
+            return cached
+        
+        product_info = self.fetch_product_info_remote(barcode)
+        
+        if product_info.get('error'):
+            # Remote lookups failed; an expired answer beats none at all
+            stale = self.product_cache.get(barcode, allow_expired=True)
+            return stale if stale is not None else product_info
+        
+        self.product_cache.put(barcode, product_info)
+        return product_info
+    
+    def fetch_product_info_remote(self, barcode):
+        """Enhanced product information fetching with multiple data sources"""
+        try:
+            # Both sources are queried at once; the first found product wins
+            return self.remote_lookup.lookup(barcode)
             
         except Exception as e:
             print(f"Product info fetch error: {e}")
@@ -228,53 +429,65 @@ class ProductAnalyzer:
         """Fetch from Open Food Facts API"""
         try:
             url = f"https://world.openfoodfacts.org/api/v0/product/{barcode}.json"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 1:
-                    product = data.get('product', {})
-                    return {
-                        'found': True,
-                        'source': 'open_food_facts',
-                        'product_name': product.get('product_name', 'Unknown'),
-                        'brands': product.get('brands', 'Unknown'),
-                        'categories': product.get('categories', ''),
-                        'ingredients_text': product.get('ingredients_text', ''),
-                        'nutriscore_grade': product.get('nutriscore_grade', 'N/A'),
-                        'ecoscore_grade': product.get('ecoscore_grade', 'N/A'),
-                        'packaging': product.get('packaging', ''),
-                        'labels': product.get('labels', ''),
-                        'image_url': product.get('image_url', ''),
-                        'allergens': product.get('allergens', ''),
-                    }
-            return {'found': False, 'source': 'open_food_facts'}
+            response = self.http.get(url, timeout=HTTP_TIMEOUT)
+            
+            if response.status_code == 404:
+                return {'found': False, 'source': 'open_food_facts'}
+            if response.status_code != 200:
+                return http_error_result('open_food_facts', response)
+            
+            data = response.json()
+            if data.get('status') == 0:
+                return {'found': False, 'source': 'open_food_facts'}
+            if data.get('status') != 1:
+                return {'found': False, 'source': 'open_food_facts', 'error': 'Unexpected response'}
+            
+            product = data.get('product', {})
+            return {
+                'found': True,
+                'source': 'open_food_facts',
+                'product_name': product.get('product_name', 'Unknown'),
+                'brands': product.get('brands', 'Unknown'),
+                'categories': product.get('categories', ''),
+                'ingredients_text': product.get('ingredients_text', ''),
+                'nutriscore_grade': product.get('nutriscore_grade', 'N/A'),
+                'ecoscore_grade': product.get('ecoscore_grade', 'N/A'),
+                'packaging': product.get('packaging', ''),
+                'labels': product.get('labels', ''),
+                'image_url': product.get('image_url', ''),
+                'allergens': product.get('allergens', ''),
+            }
         except Exception as e:
             print(f"Open Food Facts API error: {e}")
-            return {'found': False, 'source': 'open_food_facts'}
+            return {'found': False, 'source': 'open_food_facts', 'error': str(e)}
     
     def fetch_from_barcode_lookup(self, barcode):
         """Alternative barcode lookup service"""
         try:
             url = f"https://api.barcodelookup.com/v3/products?barcode={barcode}&formatted=y&key=demo"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('products'):
-                    product = data['products'][0]
-                    return {
-                        'found': True,
-                        'source': 'barcode_lookup',
-                        'product_name': product.get('product_name', 'Unknown'),
-                        'brands': product.get('brand', 'Unknown'),
-                        'categories': product.get('category', ''),
-                        'description': product.get('description', ''),
-                    }
-            return {'found': False, 'source': 'barcode_lookup'}
+            response = self.http.get(url, timeout=HTTP_TIMEOUT)
+            
+            if response.status_code == 404:
+                return {'found': False, 'source': 'barcode_lookup'}
+            if response.status_code != 200:
+                return http_error_result('barcode_lookup', response)
+            
+            data = response.json()
+            if not data.get('products'):
+                return {'found': False, 'source': 'barcode_lookup'}
+            
+            product = data['products'][0]
+            return {
+                'found': True,
+                'source': 'barcode_lookup',
+                'product_name': product.get('product_name', 'Unknown'),
+                'brands': product.get('brand', 'Unknown'),
+                'categories': product.get('category', ''),
+                'description': product.get('description', ''),
+            }
         except Exception as e:
             print(f"Barcode lookup API error: {e}")
-            return {'found': False, 'source': 'barcode_lookup'}
+            return {'found': False, 'source': 'barcode_lookup', 'error': str(e)}
     
     def extract_text(self, image):
         """Extract text from image using OCR"""
@@ -294,53 +507,30 @@ class ProductAnalyzer:
             print(f"OCR Error: {e}")
             return ""
     
+    def extract_text_with_keywords(self, image):
+        """OCR text and the sustainability keywords found in it"""
+        extracted_text = self.extract_text(image)
+        text_score, keywords = self.analyze_sustainability_from_text(extracted_text)
+        return {
+            'extracted_text': extracted_text,
+            'text_score': text_score,
+            'found_keywords': keywords
+        }
+    
     def analyze_sustainability_from_text(self, text):
         """Analyze sustainability based on extracted text"""
-        text_lower = text.lower()
-        
-        positive_keywords = {
-            'organic': 3,
-            'recyclable': 3,
-            'biodegradable': 3,
-            'compostable': 3,
-            'sustainable': 3,
-            'eco-friendly': 3,
-            'natural': 2,
-            'green': 2,
-            'renewable': 2,
-            'fair trade': 2,
-            'locally sourced': 2,
-            'carbon neutral': 3,
-            'zero waste': 3,
-            'plant-based': 2,
-            'reusable': 2,
-            'recycled': 2,
-        }
-        
-        negative_keywords = {
-            'plastic': -2,
-            'non-recyclable': -3,
-            'chemical': -1,
-            'toxic': -3,
-            'artificial': -1,
-            'synthetic': -1,
-            'petroleum': -2,
-            'disposable': -2,
-            'single-use': -3,
-        }
+        found = self.keyword_matcher.find(text, ('sustainability_positive', 'sustainability_negative'))
         
         score = 5
         found_keywords = []
         
-        for keyword, points in positive_keywords.items():
-            if keyword in text_lower:
-                score += points
-                found_keywords.append((keyword, 'positive'))
+        for keyword, points in found['sustainability_positive'].items():
+            score += points
+            found_keywords.append((keyword, 'positive'))
         
-        for keyword, points in negative_keywords.items():
-            if keyword in text_lower:
-                score += points
-                found_keywords.append((keyword, 'negative'))
+        for keyword, points in found['sustainability_negative'].items():
+            score += points
+            found_keywords.append((keyword, 'negative'))
         
         score = max(0, min(10, score))
         
@@ -348,34 +538,11 @@ class ProductAnalyzer:
     
     def analyze_packaging(self, packaging_text):
         """Analyze packaging materials for sustainability"""
-        packaging_lower = packaging_text.lower()
-        
-        packaging_scores = {
-            'glass': 8,
-            'aluminum': 7,
-            'steel': 7,
-            'cardboard': 8,
-            'paper': 8,
-            'plastic': 3,
-            'styrofoam': 1,
-            'polystyrene': 1,
-            'pet': 5,
-            'hdpe': 6,
-            'biodegradable': 9,
-            'compostable': 9,
-        }
+        found = self.keyword_matcher.find(packaging_text, ('packaging_materials',))['packaging_materials']
         
-        scores = []
-        materials_found = []
-        
-        for material, score in packaging_scores.items():
-            if material in packaging_lower:
-                scores.append(score)
-                materials_found.append(material)
-        
-        if scores:
-            avg_score = sum(scores) / len(scores)
-            return avg_score, materials_found
+        if found:
+            avg_score = sum(found.values()) / len(found)
+            return avg_score, list(found)
         
         return 5, []
     
@@ -407,8 +574,15 @@ class ProductAnalyzer:
         
         return recommendations
     
-    def analyze_product(self, image):
-        """Main analysis function combining barcode and OCR"""
+    def analyze_product(self, image, ocr_mode='auto', owner=None):
+        """
+        Main analysis function combining barcode and OCR. OCR only changes
+        the result when the barcode did not resolve the product, so
+        `ocr_mode` decides whether it still runs in that case.
+        """
+        if ocr_mode not in OCR_MODES:
+            raise ValueError(f"Unknown OCR mode '{ocr_mode}', expected one of {OCR_MODES}")
+        
         result = {
             'barcode_detected': False,
             'product_info': {},
@@ -418,7 +592,8 @@ class ProductAnalyzer:
             'packaging_score': 0,
             'packaging_materials': [],
             'recommendations': [],
-            'confidence': 0
+            'confidence': 0,
+            'ocr': 'skipped'
         }
         
         print("Starting barcode detection...")
@@ -465,11 +640,27 @@ class ProductAnalyzer:
                 result['confidence'] = 0.5
                 result['sustainability_score'] = 5
         
-        print("Extracting text via OCR...")
-        extracted_text = self.extract_text(image)
-        result['extracted_text'] = extracted_text
+        product_found = result['barcode_detected'] and result['product_info'].get('found')
+        
+        if product_found and ocr_mode == 'auto':
+            print("Product resolved from barcode, skipping OCR")
+        elif product_found and ocr_mode == 'deferred':
+            job_id = self.ocr_jobs.submit(image, owner)
+            if job_id is None:
+                # OCR does not change a resolved product, so under load it is dropped
+                print("Product resolved from barcode, OCR queue full, skipping OCR")
+            else:
+                result['ocr'] = 'deferred'
+                result['ocr_job_id'] = job_id
+                print(f"Product resolved from barcode, OCR deferred to job {job_id}")
+        else:
+            print("Extracting text via OCR...")
+            result['extracted_text'] = self.extract_text(image)
+            result['ocr'] = 'ran'
+        
+        extracted_text = result['extracted_text']
         
-        if not result['barcode_detected'] or not result['product_info'].get('found'):
+        if not product_found:
             text_score, keywords = self.analyze_sustainability_from_text(extracted_text)
             result['sustainability_score'] = text_score
             result['found_keywords'] = keywords
@@ -0,0 +1,147 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ProductCache:
+    """
+    Barcode -> product info cache: an in-memory LRU in front of SQLite.
+
+    Found products are kept for `ttl` seconds and "not found" answers for
+    `negative_ttl`. Expired products stay on disk so they can still be
+    served when the remote APIs are unreachable.
+    """
+
+    def __init__(self, db_path='ecolife_products.db', ttl=7 * 24 * 3600, negative_ttl=6 * 3600, memory_size=1024):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory_size = memory_size
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'negative_hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'writes': 0,
+        }
+
+        self.init_database()
+
+    def init_database(self):
+        """Initialize product cache database"""
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS product_cache (
+                barcode TEXT PRIMARY KEY,
+                found BOOLEAN,
+                product TEXT,
+                fetched_at REAL,
+                expires_at REAL
+            )
+        ''')
+        conn.commit()
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared across threads, so every
+        # request thread keeps its own instead of reconnecting per lookup
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, barcode, allow_expired=False):
+        """
+        Cached product info for a barcode, or None. With allow_expired, an
+        expired found product is returned as well (negative entries never).
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(barcode)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(barcode)
+                self._count('memory_hits', entry[1])
+                return dict(entry[1])
+
+        row = self._connection().execute(
+            'SELECT found, product, expires_at FROM product_cache WHERE barcode = ?', (barcode,)
+        ).fetchone()
+
+        with self._lock:
+            if row is None:
+                self._counters['misses'] += 1
+                return None
+
+            found, product, expires_at = row
+            product = json.loads(product)
+
+            if expires_at > now:
+                self._remember(barcode, expires_at, product)
+                self._count('disk_hits', product)
+                return dict(product)
+
+            if allow_expired and found:
+                self._counters['stale_hits'] += 1
+                return dict(product)
+
+            self._counters['misses'] += 1
+            return None
+
+    def put(self, barcode, product_info):
+        now = time.time()
+        found = bool(product_info.get('found'))
+        expires_at = now + (self.ttl if found else self.negative_ttl)
+
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO product_cache (barcode, found, product, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+            (barcode, found, json.dumps(product_info), now, expires_at)
+        )
+        conn.commit()
+
+        with self._lock:
+            self._remember(barcode, expires_at, dict(product_info))
+            self._counters['writes'] += 1
+
+    def purge_expired(self):
+        """Delete expired not-found entries; expired products are kept as a fallback"""
+        conn = self._connection()
+        deleted = conn.execute(
+            'DELETE FROM product_cache WHERE found = 0 AND expires_at <= ?', (time.time(),)
+        ).rowcount
+        conn.commit()
+        return deleted
+
+    def _remember(self, barcode, expires_at, product):
+        self._memory[barcode] = (expires_at, product)
+        self._memory.move_to_end(barcode)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _count(self, tier, product):
+        self._counters[tier] += 1
+        if not product.get('found'):
+            self._counters['negative_hits'] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+
+        hits = counters['memory_hits'] + counters['disk_hits']
+        lookups = hits + counters['stale_hits'] + counters['misses']
+        counters.update({
+            'memory_entries': memory_entries,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'memory_hit_rate': round(counters['memory_hits'] / lookups, 3) if lookups else 0.0,
+        })
+        return counters
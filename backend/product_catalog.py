@@ -0,0 +1,227 @@
+"""
+Local product catalog built from an Open Food Facts export.
+
+Streams a JSONL or CSV/TSV dump (optionally gzipped) into SQLite, keeping
+only the fields ProductAnalyzer uses. Re-running an import only writes
+products modified since the previous one:
+
+    python product_catalog.py openfoodfacts-products.jsonl.gz
+    python product_catalog.py en.openfoodfacts.org.products.csv.gz --db ecolife_catalog.db
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+# Product fields kept from the dump, the same ones fetch_from_open_food_facts returns
+CATALOG_FIELDS = (
+    'product_name',
+    'brands',
+    'categories',
+    'ingredients_text',
+    'nutriscore_grade',
+    'ecoscore_grade',
+    'packaging',
+    'labels',
+    'image_url',
+    'allergens',
+)
+
+FIELD_DEFAULTS = {
+    'product_name': 'Unknown',
+    'brands': 'Unknown',
+    'nutriscore_grade': 'N/A',
+    'ecoscore_grade': 'N/A',
+}
+
+
+def normalize_barcode(barcode):
+    """Digits only, without the leading zeros that pad UPC-A codes to EAN-13"""
+    digits = ''.join(c for c in str(barcode) if c.isdigit())
+    return digits.lstrip('0') or digits
+
+
+def _open_dump(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', errors='replace')
+    return open(path, encoding='utf-8', errors='replace')
+
+
+def iter_dump_records(path):
+    """Yield raw product dicts from a JSONL or CSV/TSV dump, one at a time"""
+    name = path[:-3] if path.endswith('.gz') else path
+
+    with _open_dump(path) as f:
+        if name.endswith(('.csv', '.tsv')):
+            # Ingredient lists can exceed the default csv field size
+            csv.field_size_limit(sys.maxsize)
+            first_line = f.readline()
+            delimiter = '\t' if '\t' in first_line else ','
+            header = next(csv.reader([first_line], delimiter=delimiter))
+            for row in csv.DictReader(f, fieldnames=header, delimiter=delimiter):
+                yield row
+        else:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def _to_text(value):
+    # JSONL dumps hold some of these as lists or numbers
+    if isinstance(value, list):
+        return ', '.join(str(v) for v in value)
+    return '' if value is None else str(value)
+
+
+class ProductCatalog:
+    """SQLite catalog of Open Food Facts products keyed by normalized barcode"""
+
+    def __init__(self, db_path='ecolife_catalog.db'):
+        self.db_path = db_path
+        self._local = threading.local()
+        self.init_database()
+
+    def init_database(self):
+        """Initialize product catalog database"""
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS products (
+                barcode TEXT PRIMARY KEY,
+                last_modified_t INTEGER,
+                product TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS import_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, barcode):
+        """Product info in fetch_from_open_food_facts form, or None if not in the catalog"""
+        row = self._connection().execute(
+            'SELECT product FROM products WHERE barcode = ?', (normalize_barcode(barcode),)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        product = json.loads(row[0])
+        product.update({'found': True, 'source': 'local_catalog'})
+        return product
+
+    def count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM products').fetchone()[0]
+
+    def last_import(self):
+        """Highest last_modified_t imported so far, 0 for an empty catalog"""
+        row = self._connection().execute(
+            "SELECT value FROM import_state WHERE key = 'last_modified_t'"
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def import_dump(self, path, batch_size=5000, incremental=True):
+        """
+        Stream a dump into the catalog in constant memory. With incremental,
+        products not modified since the previous import are skipped.
+        """
+        conn = self._connection()
+        watermark = self.last_import() if incremental else 0
+        newest = watermark
+
+        counts = {'read': 0, 'written': 0, 'unchanged': 0, 'invalid': 0}
+        batch = []
+        start = time.time()
+
+        def flush():
+            # Never replace a product with an older copy of itself
+            conn.executemany('''
+                INSERT INTO products (barcode, last_modified_t, product) VALUES (?, ?, ?)
+                ON CONFLICT(barcode) DO UPDATE SET
+                    last_modified_t = excluded.last_modified_t,
+                    product = excluded.product
+                WHERE excluded.last_modified_t >= products.last_modified_t
+            ''', batch)
+            conn.commit()
+            counts['written'] += len(batch)
+            batch.clear()
+
+        for record in iter_dump_records(path):
+            counts['read'] += 1
+
+            barcode = normalize_barcode(record.get('code') or '')
+            try:
+                last_modified = int(float(record.get('last_modified_t') or 0))
+            except ValueError:
+                last_modified = 0
+
+            if not barcode:
+                counts['invalid'] += 1
+                continue
+            if incremental and last_modified and last_modified <= watermark:
+                counts['unchanged'] += 1
+                continue
+
+            product = {
+                field: _to_text(record.get(field)) or FIELD_DEFAULTS.get(field, '')
+                for field in CATALOG_FIELDS
+            }
+            batch.append((barcode, last_modified, json.dumps(product)))
+            newest = max(newest, last_modified)
+
+            if len(batch) >= batch_size:
+                flush()
+                print(f"Imported {counts['written']} products ({counts['read']} read)")
+
+        if batch:
+            flush()
+
+        conn.execute(
+            "INSERT OR REPLACE INTO import_state (key, value) VALUES ('last_modified_t', ?)", (str(newest),)
+        )
+        conn.commit()
+
+        counts['seconds'] = round(time.time() - start, 1)
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import an Open Food Facts dump into the local product catalog")
+    parser.add_argument('dump', help="JSONL or CSV/TSV export, optionally .gz ('-' reads JSONL from stdin)")
+    parser.add_argument('--db', default='ecolife_catalog.db', help="catalog database to create or update")
+    parser.add_argument('--batch-size', type=int, default=5000, help="rows per transaction")
+    parser.add_argument('--full', action='store_true', help="re-import every product, not only modified ones")
+    args = parser.parse_args()
+
+    catalog = ProductCatalog(args.db)
+    counts = catalog.import_dump(args.dump, batch_size=args.batch_size, incremental=not args.full)
+
+    print(f"Read {counts['read']} records in {counts['seconds']}s: {counts['written']} written, "
+          f"{counts['unchanged']} unchanged, {counts['invalid']} without a barcode")
+    print(f"Catalog {args.db} now holds {catalog.count()} products")
+
+
+if __name__ == "__main__":
+    main()
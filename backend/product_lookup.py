@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+# Hedge delay used until a source has enough latency samples for a p95
+DEFAULT_HEDGE_DELAY = 1.5
+MIN_HEDGE_SAMPLES = 20
+# Never duplicate requests that are only a few milliseconds late
+MIN_HEDGE_DELAY = 0.1
+
+
+def create_http_session(pool_size=16):
+    """requests session that keeps connections to each API host alive between scans"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = 'EcoLife-Assistant/4.0'
+    return session
+
+
+class LatencyTracker:
+    """Recent successful response times of one source"""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q):
+        with self._lock:
+            if not self._samples:
+                return None
+            return float(np.percentile(self._samples, q))
+
+    def __len__(self):
+        return len(self._samples)
+
+
+class HedgedLookup:
+    """
+    Queries several product sources concurrently; the first found product wins.
+
+    `sources` maps a name to a function barcode -> product info dict in the
+    fetch_from_open_food_facts form. A source that has not answered within
+    its own p95 latency gets one duplicate (hedged) request. Requests still
+    running when a winner is found are abandoned and their answers dropped.
+
+    A lookup sends one request per source and at most one hedge per
+    source, so it needs at most 2 x len(sources) pool threads. Hedges are
+    only sent while fewer than `max_workers` requests are in flight, so
+    under load they are skipped rather than queued ahead of other
+    lookups' first requests. Hedging stays on at peak when `max_workers`
+    is at least 2 x len(sources) x the number of concurrent lookups.
+    """
+
+    def __init__(self, sources, timeout=10.0, max_workers=16):
+        self.sources = dict(sources)
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.latency = {name: LatencyTracker() for name in self.sources}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='product-lookup')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {'lookups': 0, 'hedges': 0, 'hedges_skipped': 0, 'timeouts': 0}
+        self._wins = dict.fromkeys(self.sources, 0)
+
+    def hedge_delay(self, name):
+        tracker = self.latency[name]
+        if len(tracker) < MIN_HEDGE_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return max(MIN_HEDGE_DELAY, tracker.percentile(95))
+
+    def _timed(self, name, barcode):
+        start = time.perf_counter()
+        result = self.sources[name](barcode)
+        if not result.get('error'):
+            self.latency[name].record(time.perf_counter() - start)
+        return result
+
+    def _submit(self, name, barcode):
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(self._timed, name, barcode)
+        future.add_done_callback(self._request_done)
+        return future
+
+    def _request_done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _reserve_hedge(self):
+        """True, counting the hedge, when a pool thread is free to run it"""
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                self._counters['hedges_skipped'] += 1
+                return False
+            self._counters['hedges'] += 1
+            return True
+
+    def lookup(self, barcode):
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        pending = {}
+        for name in self.sources:
+            pending[self._submit(name, barcode)] = name
+
+        hedge_at = {name: start + self.hedge_delay(name) for name in self.sources}
+        answered = set()
+        errors = {}
+
+        with self._lock:
+            self._counters['lookups'] += 1
+
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    with self._lock:
+                        self._counters['timeouts'] += 1
+                    for name in set(pending.values()) - answered:
+                        errors.setdefault(name, f'no answer within {self.timeout}s')
+                    break
+
+                waiting_hedges = [at for name, at in hedge_at.items() if name not in answered]
+                wake_at = min([deadline] + waiting_hedges)
+                done, _ = wait(pending, timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name = pending.pop(future)
+                    if name in answered:
+                        continue
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'found': False, 'source': name, 'error': str(e)}
+
+                    if result.get('found'):
+                        with self._lock:
+                            self._wins[name] += 1
+                        return result
+
+                    if result.get('error'):
+                        # A hedged duplicate of this source may still succeed
+                        if name not in pending.values():
+                            errors[name] = result['error']
+                    else:
+                        answered.add(name)
+                        errors.pop(name, None)
+
+                now = time.monotonic()
+                for name, at in list(hedge_at.items()):
+                    if name in answered or now < at:
+                        continue
+                    # One duplicate per source, only while the original is still out
+                    del hedge_at[name]
+                    if name in pending.values() and self._reserve_hedge():
+                        pending[self._submit(name, barcode)] = name
+        finally:
+            for future in pending:
+                future.cancel()
+
+        if errors:
+            # Not a definitive "not found", so it must not be cached as one
+            return {'found': False, 'source': 'none', 'error': '; '.join(f'{n}: {e}' for n, e in errors.items())}
+
+        return {'found': False, 'source': 'none'}
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['in_flight'] = self._in_flight
+            stats['max_workers'] = self.max_workers
+            stats['wins'] = dict(self._wins)
+
+        stats['sources'] = {
+            name: {
+                'samples': len(tracker),
+                'p50_ms': round(tracker.percentile(50) * 1000, 1) if len(tracker) else None,
+                'p95_ms': round(tracker.percentile(95) * 1000, 1) if len(tracker) else None,
+                'hedge_delay_ms': round(self.hedge_delay(name) * 1000, 1),
+            }
+            for name, tracker in self.latency.items()
+        }
+        return stats
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def compute_dhash(image, hash_size=8):
+    """64-bit difference hash of an image, robust to rescaling and recompression"""
+    if len(image.shape) == 3:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = image
+
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+
+    return int(np.packbits(bits).tobytes().hex(), 16)
+
+
+def compute_color_signature(image, grid=2, size=64):
+    """
+    Mean and standard deviation of every BGR channel in each cell of a
+    grid x grid split of the image, as uint8 values. dHash only sees the
+    signs of brightness gradients; this is what tells flat or low-texture
+    images of different color and brightness apart.
+    """
+    if len(image.shape) == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+    cell = size // grid
+    small = cv2.resize(image, (cell * grid, cell * grid), interpolation=cv2.INTER_AREA).astype(np.float32)
+    cells = small.reshape(grid, cell, grid, cell, 3)
+
+    means = cells.mean(axis=(1, 3))
+    stds = cells.std(axis=(1, 3))
+    return np.clip(np.round(np.concatenate([means.ravel(), stds.ravel()])), 0, 255).astype(np.uint8)
+
+
+def color_distance(a, b):
+    """Largest per-value difference between two color signatures"""
+    return int(np.max(np.abs(a.astype(np.int16) - b.astype(np.int16))))
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class PerceptualHashCache:
+    """
+    Bounded LRU cache of classification results keyed by image dHash plus a
+    coarse color signature.
+
+    A key matches exactly when both parts are identical. Otherwise a cached
+    entry is a near hit only when its hash lies within `max_distance` bits
+    of the query and every color signature value within `color_tolerance`,
+    so resubmitted or recompressed copies of a photo reuse the stored result
+    but images that differ in color or brightness never do. Entries older
+    than `ttl` seconds are dropped.
+    """
+
+    def __init__(self, capacity=256, ttl=600, max_distance=4, color_tolerance=8):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.color_tolerance = color_tolerance
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.capacity > 0
+
+    def key_for(self, image, variant=None):
+        """
+        Cache key of an image. `variant` separates results computed from the
+        same image with different options; only equal variants ever match.
+        """
+        return (variant, compute_dhash(image), compute_color_signature(image).tobytes())
+
+    def get(self, key):
+        """Return the cached result for `key` or a near-duplicate of it, else None"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self._expire(time.monotonic())
+
+            match = key if key in self._entries else self._find_near(key)
+            if match is None:
+                self.misses += 1
+                return None
+
+            if match == key:
+                self.hits += 1
+            else:
+                self.near_hits += 1
+
+            self._entries.move_to_end(match)
+            return self._entries[match][1]
+
+    def put(self, key, result):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                'capacity': self.capacity,
+                'size': len(self._entries),
+                'ttl_seconds': self.ttl,
+                'max_distance': self.max_distance,
+                'color_tolerance': self.color_tolerance,
+                'hits': self.hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0
+            }
+
+    def _find_near(self, key):
+        if self.max_distance < 0:
+            return None
+
+        variant, dhash, signature = key
+        signature = np.frombuffer(signature, dtype=np.uint8)
+
+        best_key = None
+        best_distance = self.max_distance + 1
+        for cached_key in self._entries:
+            cached_variant, cached_dhash, cached_signature = cached_key
+            if cached_variant != variant:
+                continue
+            distance = hamming_distance(dhash, cached_dhash)
+            if distance >= best_distance:
+                continue
+            if color_distance(signature, np.frombuffer(cached_signature, dtype=np.uint8)) > self.color_tolerance:
+                continue
+            best_key = cached_key
+            best_distance = distance
+
+        return best_key
+
+    def _expire(self, now):
+        if not self.ttl:
+            return
+
+        # Entries are kept in access order, not insertion order, so every
+        # entry has to be checked
+        expired = [key for key, (stored_at, _) in self._entries.items() if now - stored_at > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
@@ -0,0 +1,177 @@
+import json
+import os
+
+import numpy as np
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_rules.json')
+
+# Pseudo-feature holding, for the rule's own category, the highest score any
+# other category reached from the ordinary rules
+MAX_OTHER_SCORE = 'max_other_score'
+
+COMPARATORS = ('lt', 'le', 'gt', 'ge', 'between', 'between_exclusive')
+
+
+def _intervals(op, bounds):
+    """Translate a comparator into (low, high, low_inclusive, high_inclusive) intervals"""
+    if op == 'lt':
+        return [(-np.inf, float(bounds), False, False)]
+    if op == 'le':
+        return [(-np.inf, float(bounds), False, True)]
+    if op == 'gt':
+        return [(float(bounds), np.inf, False, False)]
+    if op == 'ge':
+        return [(float(bounds), np.inf, True, False)]
+    if op in ('between', 'between_exclusive'):
+        inclusive = op == 'between'
+        ranges = bounds if isinstance(bounds[0], (list, tuple)) else [bounds]
+        return [(float(low), float(high), inclusive, inclusive) for low, high in ranges]
+    raise ValueError(f"Unknown comparator '{op}', expected one of {COMPARATORS}")
+
+
+def _rule_clauses(rule):
+    """A rule is an AND of clauses, each clause an OR of conditions"""
+    if 'all' in rule:
+        return [[condition] for condition in rule['all']]
+    if 'any' in rule:
+        return [rule['any']]
+    return [[rule]]
+
+
+class _RuleMatrices:
+    """
+    One set of rules compiled into threshold and weight matrices.
+
+    Scoring is then interval tests over a feature matrix followed by three
+    matrix products: intervals -> clauses (OR), clauses -> rules (AND) and
+    rules -> category points.
+    """
+
+    def __init__(self, rules, categories, feature_index):
+        interval_features = []
+        bounds = []
+        interval_clause = []
+        clause_rule = []
+
+        for rule_idx, rule in enumerate(rules):
+            for clause in _rule_clauses(rule):
+                clause_idx = len(clause_rule)
+                clause_rule.append(rule_idx)
+                for condition in clause:
+                    for interval in _intervals(condition['op'], condition['bounds']):
+                        interval_features.append(feature_index(condition['feature'], rule))
+                        bounds.append(interval)
+                        interval_clause.append(clause_idx)
+
+        bounds = np.array(bounds, dtype=np.float64).reshape(-1, 4)
+        self.feature_index = np.array(interval_features, dtype=np.intp)
+        self.low = bounds[:, 0]
+        self.high = bounds[:, 1]
+        self.low_inclusive = bounds[:, 2].astype(bool)
+        self.high_inclusive = bounds[:, 3].astype(bool)
+
+        self.or_matrix = np.zeros((len(interval_clause), len(clause_rule)))
+        self.or_matrix[np.arange(len(interval_clause)), interval_clause] = 1
+
+        self.and_matrix = np.zeros((len(clause_rule), len(rules)))
+        self.and_matrix[np.arange(len(clause_rule)), clause_rule] = 1
+        self.clause_counts = self.and_matrix.sum(axis=0)
+
+        self.weights = np.zeros((len(rules), len(categories)))
+        for rule_idx, rule in enumerate(rules):
+            self.weights[rule_idx, categories.index(rule['category'])] = rule['points']
+
+    def evaluate(self, x):
+        values = x[:, self.feature_index]
+        above = np.where(self.low_inclusive, values >= self.low, values > self.low)
+        below = np.where(self.high_inclusive, values <= self.high, values < self.high)
+
+        clauses = ((above & below) @ self.or_matrix) > 0
+        rules = (clauses @ self.and_matrix) == self.clause_counts
+        return rules @ self.weights
+
+
+class ScoringRules:
+    """
+    Declarative category scoring table compiled into NumPy matrices.
+
+    Each rule awards `points` to `category` when its feature condition holds.
+    Rules on `max_other_score` are evaluated in a second pass, after the
+    ordinary rules have scored every category.
+    """
+
+    def __init__(self, categories, rules):
+        self.categories = list(categories)
+
+        for rule in rules:
+            if rule['category'] not in self.categories:
+                raise ValueError(f"Rule for unknown category '{rule['category']}'")
+
+        base_rules = []
+        dependent_rules = []
+        for rule in rules:
+            names = {c['feature'] for clause in _rule_clauses(rule) for c in clause}
+            if MAX_OTHER_SCORE not in names:
+                base_rules.append(rule)
+            elif names == {MAX_OTHER_SCORE}:
+                dependent_rules.append(rule)
+            else:
+                raise ValueError(f"'{MAX_OTHER_SCORE}' cannot be combined with other features in one rule")
+
+        self.features = sorted({
+            c['feature'] for rule in base_rules for clause in _rule_clauses(rule) for c in clause
+        })
+
+        self._base = _RuleMatrices(
+            base_rules, self.categories, lambda name, rule: self.features.index(name)
+        )
+        self._dependent = None
+        if dependent_rules:
+            self._dependent = _RuleMatrices(
+                dependent_rules, self.categories, lambda name, rule: self.categories.index(rule['category'])
+            )
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            config = json.load(f)
+        return cls(config['categories'], config['rules'])
+
+    def score(self, features, allow_missing=False):
+        """
+        Score a feature dict of scalars (one image) or equal-length arrays
+        (a batch). Returns an (N, len(categories)) array of points.
+
+        With allow_missing, rules on features absent from the dict do not
+        fire instead of raising KeyError.
+        """
+        columns = {
+            name: np.atleast_1d(np.asarray(features[name], dtype=np.float64))
+            for name in self.features
+            if name in features or not allow_missing
+        }
+        n = max((len(column) for column in columns.values()), default=1)
+        x = np.column_stack([
+            columns[name] if name in columns else np.full(n, np.nan) for name in self.features
+        ])
+
+        scores = self._base.evaluate(x)
+
+        if self._dependent is not None:
+            scores = scores + self._dependent.evaluate(self._max_other_scores(scores))
+
+        return scores
+
+    def _max_other_scores(self, scores):
+        if scores.shape[1] < 2:
+            return np.zeros_like(scores)
+        ordered = np.sort(scores, axis=1)
+        top = ordered[:, -1:]
+        second = ordered[:, -2:-1]
+        is_top = np.arange(scores.shape[1]) == np.argmax(scores, axis=1)[:, None]
+        return np.where(is_top, second, top)
+
+
+def load_scoring_rules(path=None):
+    """Load and compile a scoring table, the bundled one by default"""
+    return ScoringRules.from_file(path or DEFAULT_RULES_PATH)
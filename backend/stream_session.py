@@ -0,0 +1,189 @@
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+from result_cache import color_distance, compute_color_signature, compute_dhash, hamming_distance
+
+# Upper bound on the frames a client may ask to smooth over
+MAX_WINDOW = 30
+# Largest per-channel color difference still treated as the same frame
+COLOR_TOLERANCE = 8
+
+
+class StreamSession:
+    """
+    Live classification of a stream of camera frames.
+
+    Category scores are averaged over the last `window` frames so the
+    reported class does not flicker. Frames whose dHash is within
+    `hash_distance` bits of the last classified frame, and whose colors
+    match it, reuse its scores; frames arriving faster than `max_fps` are
+    rejected without any work.
+    """
+
+    def __init__(self, classifier, user_id, window=5, max_fps=5.0, hash_distance=4):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.classifier = classifier
+        self.window = window
+        self.max_fps = max_fps
+        self.hash_distance = hash_distance
+
+        self.created_at = time.monotonic()
+        self.last_activity = self.created_at
+        self._last_processed_at = None
+        self._last_hash = None
+        self._last_colors = None
+        self._last_scores = None
+        self._last_stages = []
+        self._scores = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+        self.frames_received = 0
+        self.frames_classified = 0
+        self.frames_unchanged = 0
+        self.frames_rate_limited = 0
+
+    def retry_after(self, now=None):
+        """Seconds until the next frame is accepted, 0 if one is accepted now"""
+        if self._last_processed_at is None or not self.max_fps:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._last_processed_at + 1.0 / self.max_fps - now)
+
+    def process_frame(self, image):
+        with self._lock:
+            now = time.monotonic()
+            self.last_activity = now
+            self.frames_received += 1
+
+            wait = self.retry_after(now)
+            if wait > 0:
+                self.frames_rate_limited += 1
+                return {'rate_limited': True, 'retry_after_ms': int(wait * 1000) + 1}
+
+            self._last_processed_at = now
+
+            frame_hash = compute_dhash(image)
+            frame_colors = compute_color_signature(image)
+            # dHash only sees gradients: a flat frame matches any other
+            # flat frame whatever its color
+            unchanged = (
+                self._last_hash is not None
+                and hamming_distance(frame_hash, self._last_hash) <= self.hash_distance
+                and color_distance(frame_colors, self._last_colors) <= COLOR_TOLERANCE
+            )
+
+            if unchanged:
+                self.frames_unchanged += 1
+                scores = self._last_scores
+            else:
+                scored = self.classifier.score_image(image)
+                if 'error' in scored:
+                    return scored
+                scores = scored['scores']
+                self.frames_classified += 1
+                self._last_hash = frame_hash
+                self._last_colors = frame_colors
+                self._last_scores = scores
+                self._last_stages = scored['stages_run']
+
+            self._scores.append(scores)
+            smoothed = np.mean(self._scores, axis=0)
+
+            result = self.classifier.result_from_scores(smoothed, self._last_stages)
+            result['frame_index'] = self.frames_received
+            result['frame_unchanged'] = unchanged
+            result['frames_smoothed'] = len(self._scores)
+            return result
+
+    def stats(self):
+        return {
+            'session_id': self.id,
+            'window': self.window,
+            'max_fps': self.max_fps,
+            'frames_received': self.frames_received,
+            'frames_classified': self.frames_classified,
+            'frames_unchanged': self.frames_unchanged,
+            'frames_rate_limited': self.frames_rate_limited,
+            'duration_seconds': round(time.monotonic() - self.created_at, 2)
+        }
+
+
+class StreamSessionManager:
+    """Owns the open stream sessions and drops the ones that went idle"""
+
+    def __init__(self, classifier, max_sessions=100, idle_timeout=60, max_fps=5.0, window=5, hash_distance=4):
+        self.classifier = classifier
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_fps = max_fps
+        self.window = window
+        self.hash_distance = hash_distance
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def start(self, user_id, max_fps=None, window=None):
+        """
+        Open a session, or return None when the server is at capacity.
+        Raises ValueError for a non-numeric or non-positive max_fps/window.
+        """
+        # Clients may ask for less than the server limits, never more
+        fps = self.max_fps
+        if max_fps is not None:
+            fps = min(self._positive(max_fps, float, 'max_fps'), self.max_fps)
+
+        frames = self.window
+        if window is not None:
+            frames = min(self._positive(window, int, 'window'), MAX_WINDOW)
+
+        with self._lock:
+            self._expire()
+            if len(self._sessions) >= self.max_sessions:
+                return None
+
+            session = StreamSession(
+                self.classifier,
+                user_id,
+                window=frames,
+                max_fps=fps,
+                hash_distance=self.hash_distance
+            )
+            self._sessions[session.id] = session
+            return session
+
+    @staticmethod
+    def _positive(value, kind, name):
+        if isinstance(value, bool):
+            raise ValueError(f"{name} must be a positive number")
+        try:
+            number = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a positive number")
+        if not number > 0 or number == float('inf'):
+            raise ValueError(f"{name} must be a positive number")
+        return number
+
+    def get(self, session_id, user_id):
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is None or session.user_id != user_id:
+                return None
+            return session
+
+    def stop(self, session_id, user_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.user_id != user_id:
+                return None
+            return self._sessions.pop(session_id)
+
+    def _expire(self):
+        now = time.monotonic()
+        idle = [sid for sid, s in self._sessions.items() if now - s.last_activity > self.idle_timeout]
+        for sid in idle:
+            del self._sessions[sid]
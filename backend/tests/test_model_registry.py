@@ -0,0 +1,54 @@
+import os
+import threading
+import time
+
+import pytest
+
+from model_registry import ModelRegistry
+from waste_classifier import WasteClassifier
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs os.fork")
+def test_child_resumes_preload_interrupted_by_fork():
+    classifier = WasteClassifier(backend='tflite')
+    parent = os.getpid()
+    loading = threading.Event()
+    release = threading.Event()
+
+    def load():
+        # Holds the classifier's load lock the way load_model() does
+        with classifier._load_lock:
+            if os.getpid() == parent:
+                loading.set()
+                release.wait(10)
+        classifier._ready.set()
+        return classifier
+
+    registry = ModelRegistry()
+    registry.register('waste_cnn', load)
+    registry.preload_async(['waste_cnn'])
+    assert loading.wait(5)
+
+    pid = os.fork()
+    if pid == 0:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if registry.is_loaded('waste_cnn') and classifier.is_ready:
+                os._exit(0)
+            time.sleep(0.01)
+        os._exit(1)
+
+    release.set()
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert registry.get('waste_cnn') is classifier
+
+
+def test_preload_async_loads_in_background():
+    registry = ModelRegistry()
+    registry.register('model', lambda: 'weights')
+
+    registry.preload_async().join(5)
+
+    assert registry.is_loaded('model')
+    assert registry.stats()['models']['model']['loaded']
@@ -0,0 +1,69 @@
+import pytest
+
+# pyzbar needs the zbar shared library, which raises a plain ImportError
+product_analyzer = pytest.importorskip('product_analyzer', exc_type=ImportError)
+
+from product_cache import ProductCache
+from product_catalog import ProductCatalog
+
+BARCODE = '3017620422003'
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    return product_analyzer.ProductAnalyzer(
+        product_cache=ProductCache(db_path=str(tmp_path / 'products.db')),
+        product_catalog=ProductCatalog(str(tmp_path / 'catalog.db')),
+        lookup_timeout=2.0
+    )
+
+
+def respond_with(analyzer, monkeypatch, status_code, data=None):
+    monkeypatch.setattr(analyzer.http, 'get', lambda url, timeout=None: FakeResponse(status_code, data))
+
+
+@pytest.mark.parametrize('status_code', [429, 503])
+def test_http_errors_are_not_a_final_not_found(analyzer, monkeypatch, status_code):
+    respond_with(analyzer, monkeypatch, status_code)
+
+    assert analyzer.fetch_from_open_food_facts(BARCODE)['error'] == f'HTTP {status_code}'
+    assert analyzer.fetch_from_barcode_lookup(BARCODE)['error'] == f'HTTP {status_code}'
+
+    result = analyzer.fetch_product_info_from_barcode(BARCODE)
+    assert not result['found']
+    assert result.get('error')
+    assert analyzer.product_cache.get(BARCODE) is None
+
+
+@pytest.mark.parametrize('status_code', [429, 503])
+def test_http_errors_fall_back_to_a_stale_entry(analyzer, monkeypatch, status_code):
+    product = {'found': True, 'source': 'open_food_facts', 'product_name': 'Spread'}
+    analyzer.product_cache.ttl = -1
+    analyzer.product_cache.put(BARCODE, product)
+    respond_with(analyzer, monkeypatch, status_code)
+
+    assert analyzer.fetch_product_info_from_barcode(BARCODE)['product_name'] == 'Spread'
+
+
+def test_not_found_is_cached(analyzer, monkeypatch):
+    respond_with(analyzer, monkeypatch, 404)
+
+    result = analyzer.fetch_product_info_from_barcode(BARCODE)
+
+    assert result == {'found': False, 'source': 'none'}
+    assert analyzer.product_cache.get(BARCODE) == result
+
+
+def test_open_food_facts_unknown_product(analyzer, monkeypatch):
+    respond_with(analyzer, monkeypatch, 200, {'status': 0})
+
+    assert analyzer.fetch_from_open_food_facts(BARCODE) == {'found': False, 'source': 'open_food_facts'}
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from texture_features import compute_glcm, quantize_gray
+
+
+def test_quantize_matches_integer_division_for_divisors_of_256():
+    gray = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    for levels in (1, 2, 8, 16, 256):
+        np.testing.assert_array_equal(quantize_gray(gray, levels), gray.astype(np.intp) // (256 // levels))
+
+
+@pytest.mark.parametrize('levels', [7, 10, 100])
+def test_glcm_with_levels_not_dividing_256(levels):
+    gray = np.arange(256, dtype=np.uint8).reshape(16, 16)
+
+    quantized = quantize_gray(gray, levels)
+    assert quantized.min() == 0
+    assert quantized.max() == levels - 1
+
+    glcm = compute_glcm(gray, levels)
+    assert glcm.shape == (levels, levels)
+    assert glcm.sum() == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize('levels', [0, 257])
+def test_out_of_range_levels_are_rejected(levels):
+    with pytest.raises(ValueError):
+        compute_glcm(np.zeros((4, 4), dtype=np.uint8), levels)
@@ -0,0 +1,155 @@
+import numpy as np
+
+# Horizontal and vertical neighbours, the pairs AdvancedWasteClassifier has
+# always counted.
+DEFAULT_GLCM_OFFSETS = ((0, 1), (1, 0))
+
+
+def quantize_gray(gray, levels=8):
+    """Map a uint8 gray image onto `levels` equal-width intensity bins, 1 to 256"""
+    if not 1 <= levels <= 256:
+        raise ValueError(f"levels must be between 1 and 256, got {levels}")
+    # Same bins as gray // (256 // levels) when levels divides 256, and
+    # never past levels - 1 when it does not
+    return (gray.astype(np.intp) * levels) >> 8
+
+
+def compute_glcm(gray, levels=8, offsets=DEFAULT_GLCM_OFFSETS):
+    """
+    Build a normalized gray-level co-occurrence matrix.
+
+    The image is quantized once and every (dy, dx) offset is counted with a
+    single bincount. Only anchor pixels for which all offsets stay inside the
+    image contribute, so the default offsets count exactly the pairs of the
+    original per-pixel loop.
+    """
+    quantized = quantize_gray(gray, levels)
+    h, w = quantized.shape
+
+    top = max(0, -min(dy for dy, _ in offsets))
+    bottom = h - max(0, max(dy for dy, _ in offsets))
+    left = max(0, -min(dx for _, dx in offsets))
+    right = w - max(0, max(dx for _, dx in offsets))
+
+    glcm = np.zeros(levels * levels, dtype=np.float64)
+    if bottom <= top or right <= left:
+        return glcm.reshape(levels, levels)
+
+    anchor = quantized[top:bottom, left:right] * levels
+    for dy, dx in offsets:
+        neighbour = quantized[top + dy:bottom + dy, left + dx:right + dx]
+        glcm += np.bincount((anchor + neighbour).ravel(), minlength=levels * levels)
+
+    total = glcm.sum()
+    if total > 0:
+        glcm /= total
+
+    return glcm.reshape(levels, levels)
+
+
+def glcm_statistics(glcm):
+    """Haralick-style statistics of a normalized co-occurrence matrix"""
+    levels = glcm.shape[0]
+    i, j = np.indices((levels, levels))
+    diff_sq = (i - j) ** 2
+
+    asm = np.sum(glcm ** 2)
+
+    mu_i = np.sum(i * glcm)
+    mu_j = np.sum(j * glcm)
+    sigma_i = np.sqrt(np.sum(glcm * (i - mu_i) ** 2))
+    sigma_j = np.sqrt(np.sum(glcm * (j - mu_j) ** 2))
+    if sigma_i > 0 and sigma_j > 0:
+        correlation = np.sum(glcm * (i - mu_i) * (j - mu_j)) / (sigma_i * sigma_j)
+    else:
+        # A constant image is perfectly correlated with itself
+        correlation = 1.0
+
+    nonzero = glcm[glcm > 0]
+
+    return {
+        'contrast': float(np.sum(glcm * diff_sq)),
+        'homogeneity': float(np.sum(glcm / (1 + diff_sq))),
+        'asm': float(asm),
+        'energy': float(np.sqrt(asm)),
+        'correlation': float(correlation),
+        'entropy': float(-np.sum(nonzero * np.log2(nonzero))),
+    }
+
+
+# (dy, dx) of each LBP neighbour, from the most significant bit down. The
+# order walks the ring clockwise so bit rotations are image rotations.
+LBP_NEIGHBOURS = (
+    (-1, -1), (-1, 0), (-1, 1), (0, 1),
+    (1, 1), (1, 0), (1, -1), (0, -1),
+)
+
+LBP_MODES = ('default', 'uniform', 'rotation_invariant')
+
+
+def _rotate_byte(code, shift):
+    return ((code >> shift) | (code << (8 - shift))) & 0xFF
+
+
+def _build_lbp_lookup_tables():
+    codes = np.arange(256)
+
+    transitions = np.zeros(256, dtype=np.intp)
+    for bit in range(8):
+        transitions += ((codes >> bit) & 1) != ((codes >> ((bit + 1) % 8)) & 1)
+    uniform_codes = codes[transitions <= 2]
+    # 58 uniform patterns get their own bin, everything else shares bin 58
+    uniform_lut = np.full(256, len(uniform_codes), dtype=np.intp)
+    uniform_lut[uniform_codes] = np.arange(len(uniform_codes))
+
+    rotation_minimum = np.min([_rotate_byte(codes, s) for s in range(8)], axis=0)
+    ri_codes = np.unique(rotation_minimum)
+    ri_lut = np.searchsorted(ri_codes, rotation_minimum)
+
+    return {
+        'default': (codes, 256),
+        'uniform': (uniform_lut, len(uniform_codes) + 1),
+        'rotation_invariant': (ri_lut, len(ri_codes)),
+    }
+
+
+LBP_LOOKUP_TABLES = _build_lbp_lookup_tables()
+
+
+def compute_lbp_codes(gray):
+    """
+    8-neighbour LBP codes for every interior pixel, built from eight shifted
+    comparisons instead of a per-pixel loop. Border pixels keep code 0.
+    """
+    h, w = gray.shape
+    codes = np.zeros((h, w), dtype=np.uint8)
+    if h < 3 or w < 3:
+        return codes
+
+    center = gray[1:-1, 1:-1]
+    interior = codes[1:-1, 1:-1]
+    for bit, (dy, dx) in zip(range(7, -1, -1), LBP_NEIGHBOURS):
+        neighbour = gray[1 + dy:h - 1 + dy, 1 + dx:w - 1 + dx]
+        interior |= (neighbour > center).astype(np.uint8) << bit
+
+    return codes
+
+
+def lbp_histogram(gray, mode='default'):
+    """
+    Normalized LBP histogram in 'default' (256 bins), 'uniform' (59 bins) or
+    'rotation_invariant' (36 bins) form, plus its standard deviation.
+    """
+    if mode not in LBP_LOOKUP_TABLES:
+        raise ValueError(f"Unknown LBP mode '{mode}', expected one of {LBP_MODES}")
+
+    lut, bins = LBP_LOOKUP_TABLES[mode]
+    codes = compute_lbp_codes(gray)
+    hist = np.bincount(lut[codes].ravel(), minlength=bins).astype("float")
+    hist /= (hist.sum() + 1e-10)
+
+    return {
+        'mode': mode,
+        'histogram': hist,
+        'std': float(np.std(hist)),
+    }
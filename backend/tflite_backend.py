@@ -0,0 +1,194 @@
+"""
+TFLite inference backend for WasteClassifier.
+
+Converts the Keras model to a quantized .tflite artifact and runs it through
+the TFLite interpreter. When the standalone `tflite-runtime` package is
+installed, inference does not import TensorFlow at all:
+
+    python tflite_backend.py --quantization int8 --images-dir photos/
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+DEFAULT_TFLITE_PATH = os.path.join(MODELS_DIR, 'waste_classifier.tflite')
+
+# float16: weights stored as float16, float math at runtime
+# dynamic: int8 weights, activations quantized on the fly
+# int8: full integer model, calibrated on representative images
+QUANTIZATION_MODES = ('float16', 'dynamic', 'int8')
+
+
+def _interpreter_class():
+    """The lightest available TFLite interpreter, full TensorFlow as a last resort"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+def convert_keras_model(model, output_path=DEFAULT_TFLITE_PATH, quantization='float16', representative_images=None):
+    """
+    Convert a Keras model to a quantized TFLite flatbuffer at `output_path`.
+    `representative_images` are preprocessed (224, 224, 3) float32 inputs,
+    required for int8 calibration.
+    """
+    import tensorflow as tf
+
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        if representative_images is None or len(representative_images) == 0:
+            raise ValueError("int8 quantization needs representative images for calibration")
+
+        def representative_dataset():
+            for image in representative_images:
+                yield [np.expand_dims(image, axis=0).astype(np.float32)]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    flatbuffer = converter.convert()
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(flatbuffer)
+
+    print(f"TFLite model ({quantization}) written to {output_path}, {len(flatbuffer) / 1024:.0f} KB")
+    return output_path
+
+
+class TFLiteBackend:
+    """
+    Callable wrapper around a TFLite interpreter: (N, 224, 224, 3) float32
+    batch in, (N, classes) float32 probabilities out. Quantized integer
+    inputs and outputs are converted transparently.
+    """
+
+    def __init__(self, model_path=DEFAULT_TFLITE_PATH, num_threads=None):
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self._interpreter = _interpreter_class()(model_path=model_path, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = int(self._input['shape'][0])
+        # The interpreter keeps per-invocation state and is not thread-safe
+        self._lock = threading.Lock()
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+
+        with self._lock:
+            if batch.shape[0] != self._batch_size:
+                self._interpreter.resize_tensor_input(self._input['index'], batch.shape)
+                self._interpreter.allocate_tensors()
+                self._input = self._interpreter.get_input_details()[0]
+                self._output = self._interpreter.get_output_details()[0]
+                self._batch_size = batch.shape[0]
+
+            self._interpreter.set_tensor(self._input['index'], self._quantize(batch))
+            self._interpreter.invoke()
+            output = self._interpreter.get_tensor(self._output['index'])
+
+        return self._dequantize(output)
+
+    def _quantize(self, batch):
+        dtype = self._input['dtype']
+        if dtype == np.float32:
+            return batch
+        scale, zero_point = self._input['quantization']
+        info = np.iinfo(dtype)
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+    def _dequantize(self, output):
+        if output.dtype == np.float32:
+            return output
+        scale, zero_point = self._output['quantization']
+        return (output.astype(np.float32) - zero_point) * scale
+
+
+def compare_backends(reference, candidate, images, repeat=5):
+    """
+    Accuracy and latency of `candidate` against `reference`, two
+    WasteClassifier instances, over the same images
+    """
+    batch = np.stack([reference.preprocess(image) for image in images])
+    expected = reference._infer(batch)
+    actual = candidate._infer(batch)
+
+    def single_image_latency_ms(classifier):
+        timings = []
+        for image in batch:
+            single = image[None]
+            classifier._infer(single)
+            for _ in range(repeat):
+                start = time.perf_counter()
+                classifier._infer(single)
+                timings.append((time.perf_counter() - start) * 1000.0)
+        return {
+            'p50_ms': round(float(np.percentile(timings, 50)), 3),
+            'p90_ms': round(float(np.percentile(timings, 90)), 3),
+        }
+
+    return {
+        'images': len(images),
+        'top1_agreement': round(float(np.mean(np.argmax(expected, 1) == np.argmax(actual, 1))), 4),
+        'max_abs_probability_diff': round(float(np.max(np.abs(expected - actual))), 6),
+        'mean_abs_probability_diff': round(float(np.mean(np.abs(expected - actual))), 6),
+        'reference_latency': single_image_latency_ms(reference),
+        'candidate_latency': single_image_latency_ms(candidate),
+    }
+
+
+def main():
+    from benchmark_classifiers import load_image_set
+    from waste_classifier import WasteClassifier
+
+    parser = argparse.ArgumentParser(description="Convert the waste CNN to TFLite and compare it with Keras")
+    parser.add_argument('--quantization', choices=QUANTIZATION_MODES, default='float16')
+    parser.add_argument('--output', default=DEFAULT_TFLITE_PATH, help="where to write the .tflite model")
+    parser.add_argument('--keras-model', help="Keras artifact to convert (default: the bundled one)")
+    parser.add_argument('--images-dir', help="real photos used for calibration and comparison")
+    parser.add_argument('--threads', type=int, default=None, help="TFLite interpreter threads")
+    parser.add_argument('--repeat', type=int, default=5, help="timed calls per image")
+    args = parser.parse_args()
+
+    keras_classifier = WasteClassifier(model_path=args.keras_model)
+    keras_classifier.load_model()
+
+    images = [image for _, image in load_image_set(((224, 224), (480, 640)), args.images_dir)]
+    calibration = [keras_classifier.preprocess(image) for image in images]
+
+    convert_keras_model(keras_classifier.model, args.output, args.quantization, calibration)
+
+    tflite_classifier = WasteClassifier(model_path=args.output, backend='tflite', num_threads=args.threads)
+    tflite_classifier.load_model()
+
+    report = compare_backends(keras_classifier, tflite_classifier, images, args.repeat)
+    for key, value in report.items():
+        print(f"{key:<28}{value}")
+
+
+if __name__ == "__main__":
+    main()
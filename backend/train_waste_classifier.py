@@ -0,0 +1,49 @@
+"""
+Train WasteClassifier on a directory of labelled photos:
+
+    data/
+      recyclable/*.jpg
+      organic/*.jpg
+      landfill/*.jpg
+
+    python train_waste_classifier.py data/ --validation-dir val/ --epochs 20
+
+The best checkpoint is written to the model artifact the server loads at
+startup (ECOLIFE_MODEL_PATH, models/waste_classifier.keras by default).
+"""
+import argparse
+import os
+
+from waste_classifier import WasteClassifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the EcoLife CNN waste classifier")
+    parser.add_argument('data_dir', help="directory with one sub-directory of images per class")
+    parser.add_argument('--validation-dir', help="held-out images in the same layout")
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--shuffle-buffer', type=int, default=512,
+                        help="images held in the shuffle buffer")
+    parser.add_argument('--cache-dir', help="cache decoded images on local disk between epochs")
+    parser.add_argument('--model-path', default=os.environ.get('ECOLIFE_MODEL_PATH'),
+                        help="artifact to start from and checkpoint to")
+    args = parser.parse_args()
+
+    classifier = WasteClassifier(model_path=args.model_path)
+    history = classifier.train(
+        args.data_dir,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        validation_dir=args.validation_dir,
+        shuffle_buffer=args.shuffle_buffer,
+        cache_dir=args.cache_dir
+    )
+
+    for metric, values in history.items():
+        print(f"{metric:<16}{values[-1]:.4f}")
+    print(f"Model checkpointed to {classifier.model_path}")
+
+
+if __name__ == "__main__":
+    main()
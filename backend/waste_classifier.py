@@ -1,12 +1,71 @@
-import tensorflow as tf
+import importlib.util
+import os
+import threading
+import time
+
 import numpy as np
 import cv2
-from tensorflow import keras
+
+from tflite_backend import DEFAULT_TFLITE_PATH, TFLiteBackend
+
+# Imported by the Keras backend on construction; workers on the TFLite
+# backend only need the interpreter and never load TensorFlow
+tf = None
+keras = None
+
+TENSORFLOW_AVAILABLE = importlib.util.find_spec('tensorflow') is not None
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'waste_classifier.keras')
+
+BACKENDS = ('keras', 'tflite')
+
+TRAINING_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+
+def _import_tensorflow():
+    """Import TensorFlow into the module globals on first use"""
+    global tf, keras
+    if tf is None:
+        try:
+            import tensorflow
+            from tensorflow import keras as tf_keras
+        except ImportError as e:
+            raise ImportError(
+                "The 'keras' backend needs TensorFlow; install tensorflow or use backend='tflite'"
+            ) from e
+        tf, keras = tensorflow, tf_keras
+    return tf
 
 class WasteClassifier:
-    def __init__(self):
+    def __init__(self, model_path=None, backend='keras', num_threads=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        if backend == 'keras':
+            _import_tensorflow()
+        
         self.model = None
+        self.backend = backend
+        self.num_threads = num_threads
+        self.model_path = model_path or (DEFAULT_TFLITE_PATH if backend == 'tflite' else DEFAULT_MODEL_PATH)
         self.class_names = ['recyclable', 'organic', 'landfill']
+        self._forward = None
+        self._ready = threading.Event()
+        self._load_lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+    
+    @property
+    def is_ready(self):
+        """True once the model is loaded and a warm-up inference has run"""
+        return self._ready.is_set()
+    
+    def _after_fork(self):
+        # A load or warm-up running in the parent does not continue in the
+        # child, and the lock it held would never be released there
+        self._load_lock = threading.Lock()
+        ready = self._ready.is_set()
+        self._ready = threading.Event()
+        if ready:
+            self._ready.set()
         
     def get_disposal_instructions(self, waste_type):
         instructions = {
@@ -43,8 +102,100 @@ class WasteClassifier:
         )
         
         self.model = model
+        self._forward = None
         return model
     
+    def save_model(self, path=None):
+        """Write the current model to a .keras artifact"""
+        path = path or self.model_path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.model.save(path)
+        print(f"Waste classifier model saved to {path}")
+        return path
+    
+    def load_model(self, path=None):
+        """
+        Load the model artifact, building and saving a fresh model when there
+        is none yet so later restarts reuse the same weights. Without an
+        explicit `path`, an already loaded model is kept.
+        """
+        reload = path is not None
+        path = path or self.model_path
+        with self._load_lock:
+            if self.model is not None and not reload:
+                # Another thread loaded it while this one waited for the lock
+                return self.model
+            if self.backend == 'tflite':
+                # Converting needs full TensorFlow, see tflite_backend.py
+                self.model = TFLiteBackend(path, num_threads=self.num_threads)
+                print(f"Waste classifier TFLite model loaded from {path}")
+            elif os.path.exists(path):
+                self.model = keras.models.load_model(path)
+                self._forward = None
+                print(f"Waste classifier model loaded from {path}")
+            else:
+                print(f"No model artifact at {path}, creating a new model")
+                self.create_model()
+                self.save_model(path)
+        return self.model
+    
+    def warm_up(self):
+        """
+        Load the model and run one dummy inference so graph tracing happens
+        at startup rather than on the first request
+        """
+        start = time.perf_counter()
+        if self.model is None:
+            self.load_model()
+        
+        self._infer(np.zeros((1, 224, 224, 3), dtype=np.float32))
+        self._ready.set()
+        print(f"Waste classifier warmed up in {time.perf_counter() - start:.2f}s")
+    
+    def warm_up_async(self):
+        """Warm up on a background thread; is_ready reports when it is done"""
+        thread = threading.Thread(target=self.warm_up, name='waste-classifier-warmup', daemon=True)
+        thread.start()
+        return thread
+    
+    def _infer(self, batch):
+        if self.backend == 'tflite':
+            return self.model(batch)
+        
+        # A compiled forward pass skips the per-call setup of model.predict;
+        # the unknown batch dimension keeps it to a single trace for any batch size
+        if self._forward is None:
+            model = self.model
+            self._forward = tf.function(
+                lambda x: model(x, training=False),
+                input_signature=[tf.TensorSpec((None, 224, 224, 3), tf.float32)]
+            )
+        return self._forward(batch).numpy()
+    
+    def preprocess(self, image):
+        """BGR image of any size -> normalized (224, 224, 3) float32 model input"""
+        image = cv2.resize(image, (224, 224))
+        return image.astype(np.float32) / 255.0
+    
+    def result_from_probabilities(self, probabilities):
+        class_idx = np.argmax(probabilities)
+        waste_type = self.class_names[class_idx]
+        
+        return {
+            'waste_type': waste_type,
+            'confidence': float(probabilities[class_idx]),
+            'probabilities': {name: float(p) for name, p in zip(self.class_names, probabilities)},
+            'disposal_instructions': self.get_disposal_instructions(waste_type)
+        }
+    
+    def error_result(self, error):
+        return {
+            'error': str(error),
+            'waste_type': 'unclassified',
+            'confidence': 0.0,
+            'disposal_instructions': 'Prediction error occurred'
+        }
+    
     def train_dummy_data(self):
         """Create dummy data for testing (we'll use real data later)"""
         x_train = np.random.random((100, 224, 224, 3)).astype(np.float32)
@@ -53,43 +204,139 @@ class WasteClassifier:
         
         return x_train, y_train
     
+    def _require_keras(self, action):
+        if self.backend != 'keras':
+            raise ValueError(
+                f"{action} needs the 'keras' backend with TensorFlow installed, not '{self.backend}'"
+            )
+    
+    def list_training_images(self, data_dir):
+        """(paths, labels) for data_dir/<class_name>/<image> files, one folder per class"""
+        paths = []
+        labels = []
+        for label, class_name in enumerate(self.class_names):
+            class_dir = os.path.join(data_dir, class_name)
+            if not os.path.isdir(class_dir):
+                print(f"No training images for '{class_name}' in {data_dir}")
+                continue
+            for root, _, files in os.walk(class_dir):
+                for name in sorted(files):
+                    if name.lower().endswith(TRAINING_IMAGE_EXTENSIONS):
+                        paths.append(os.path.join(root, name))
+                        labels.append(label)
+        
+        if not paths:
+            raise ValueError(f"No labelled images found under {data_dir}")
+        return paths, labels
+    
+    def training_dataset(self, data_dir, batch_size=32, shuffle_buffer=512, cache_path=None, training=True):
+        """
+        Stream labelled images from disk as batches of (image, one-hot label).
+        
+        Only file paths are held in memory up front. Images are decoded and
+        resized in parallel, optionally cached to a local file as uint8,
+        shuffled through a bounded buffer and prefetched, so memory stays
+        flat however large the dataset is.
+        """
+        self._require_keras("Building a training dataset")
+        paths, labels = self.list_training_images(data_dir)
+        num_classes = len(self.class_names)
+        
+        def load(path, label):
+            image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+            image = tf.image.resize(image, (224, 224))
+            # decode_image gives RGB; predict() sees OpenCV's BGR
+            image = tf.reverse(image, axis=[-1])
+            return tf.cast(tf.round(image), tf.uint8), label
+        
+        def normalize(image, label):
+            return tf.cast(image, tf.float32) / 255.0, tf.one_hot(label, num_classes)
+        
+        dataset = tf.data.Dataset.from_tensor_slices((paths, labels))
+        dataset = dataset.map(load, num_parallel_calls=tf.data.AUTOTUNE)
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+            dataset = dataset.cache(cache_path)
+        if training:
+            dataset = dataset.shuffle(shuffle_buffer, reshuffle_each_iteration=True)
+        dataset = dataset.map(normalize, num_parallel_calls=tf.data.AUTOTUNE)
+        
+        return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    
+    def train(self, data_dir, epochs=10, batch_size=32, validation_dir=None,
+              shuffle_buffer=512, cache_dir=None):
+        """
+        Train on an image directory tree, checkpointing to the artifact that
+        load_model() reads at startup
+        """
+        self._require_keras("Training")
+        if self.model is None:
+            self.load_model()
+        
+        def cache_path(split):
+            return os.path.join(cache_dir, f"{split}.tfcache") if cache_dir else None
+        
+        train_data = self.training_dataset(
+            data_dir, batch_size, shuffle_buffer, cache_path('train')
+        )
+        validation_data = None
+        if validation_dir:
+            validation_data = self.training_dataset(
+                validation_dir, batch_size, shuffle_buffer, cache_path('validation'), training=False
+            )
+        
+        os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
+        checkpoint = keras.callbacks.ModelCheckpoint(
+            self.model_path,
+            monitor='val_loss' if validation_data is not None else 'loss',
+            save_best_only=True
+        )
+        
+        history = self.model.fit(
+            train_data,
+            epochs=epochs,
+            validation_data=validation_data,
+            callbacks=[checkpoint]
+        )
+        
+        # Weights changed under the traced forward pass
+        self._forward = None
+        return history.history
+    
     def predict(self, image):
         """Predict waste type from image"""
         try:
             if self.model is None:
-                self.create_model()
-            
-            image = cv2.resize(image, (224, 224))
-            image = image / 255.0 
-            image = np.expand_dims(image, axis=0)
+                self.load_model()
             
-            predictions = self.model.predict(image)
-            class_idx = np.argmax(predictions[0])
-            confidence = predictions[0][class_idx]
+            image = np.expand_dims(self.preprocess(image), axis=0)
             
-            waste_type = self.class_names[class_idx]
-            confidence_value = float(confidence)
+            predictions = self._infer(image)
             
             # FIXED: Return a dictionary instead of a tuple
-            return {
-                'waste_type': waste_type,
-                'confidence': confidence_value,
-                'disposal_instructions': self.get_disposal_instructions(waste_type)
-            }
+            return self.result_from_probabilities(predictions[0])
             
         except Exception as e:
-            return {
-                'error': str(e),
-                'waste_type': 'unclassified',
-                'confidence': 0.0,
-                'disposal_instructions': 'Prediction error occurred'
-            }
+            return self.error_result(e)
+    
+    def predict_batch(self, images):
+        """Predict waste types for several images with one forward pass"""
+        try:
+            if self.model is None:
+                self.load_model()
+            
+            batch = np.stack([self.preprocess(image) for image in images])
+            return [self.result_from_probabilities(p) for p in self._infer(batch)]
+        
+        except Exception as e:
+            return [self.error_result(e) for _ in images]
 
 if __name__ == "__main__":
     classifier = WasteClassifier()
     classifier.create_model()
 
     x_train, y_train = classifier.train_dummy_data()
+    classifier.save_model()
     
     print("Waste Classifier created successfully!")
     print(f"Model summary:")